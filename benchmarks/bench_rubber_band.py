@@ -0,0 +1,102 @@
+"""Replay synthetic box drawing drags on the canvas and report the time
+spent handling mouse events, as JSON.
+
+Needs a display, e.g. `xvfb-run python benchmarks/bench_rubber_band.py`."""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from PIL import Image as PIL_Image
+
+from easybox.app import EasyBox
+
+
+class Event:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.state = 0
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def summary(values):
+    return {
+        "count": len(values),
+        "mean_ms": 1000 * sum(values) / len(values),
+        "p50_ms": 1000 * percentile(values, 0.5),
+        "p95_ms": 1000 * percentile(values, 0.95),
+        "max_ms": 1000 * max(values),
+    }
+
+
+def replay(win, drags, moves, burst):
+    """Draw `drags` boxes with `moves` motion events each. With `burst`,
+    all motion events of a drag are handled before the canvas is updated,
+    as when the UI falls behind the mouse."""
+    rng = random.Random(0)
+    width, height = win.canvas.winfo_width(), win.canvas.winfo_height()
+    event_times = []
+    drag_times = []
+    for _ in range(drags):
+        x0, y0 = rng.randrange(width // 2), rng.randrange(height // 2)
+        x1, y1 = x0 + rng.randrange(10, width // 2), y0 + rng.randrange(10, height // 2)
+        drag_start = time.perf_counter()
+        win.left_mouse_click(Event(x0, y0))
+        for i in range(1, moves + 1):
+            event = Event(x0 + (x1 - x0) * i // moves, y0 + (y1 - y0) * i // moves)
+            start = time.perf_counter()
+            win.left_mouse_motion(event)
+            if not burst:
+                win.update_idletasks()
+            event_times.append(time.perf_counter() - start)
+        win.update_idletasks()
+        win.left_mouse_release(Event(x1, y1))
+        win.update_idletasks()
+        drag_times.append(time.perf_counter() - drag_start)
+        # Keep the number of canvas items constant between drags
+        win.delete_box()
+    return {"events": summary(event_times), "drags": summary(drag_times)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--drags", type=int, default=200)
+    parser.add_argument("--moves", type=int, default=100)
+    parser.add_argument("--size", type=int, default=1024, help="image size")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as img_folder:
+        img_path = os.path.join(img_folder, "image.png")
+        PIL_Image.new("RGB", (args.size, args.size), "white").save(img_path)
+
+        win = EasyBox()
+        win.img_folder = img_folder
+        win.boxes_folder = os.path.join(img_folder, "easybox")
+        win.set_img_paths([img_path])
+        win.update()
+
+        result = {
+            "drags": args.drags,
+            "moves_per_drag": args.moves,
+            "each_event": replay(win, args.drags, args.moves, burst=False),
+            "burst": replay(win, args.drags, args.moves, burst=True),
+        }
+        win.close_writer()
+        win.destroy()
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Measure how long easybox modules take to import and how long the window
+takes to show its first frame, each in a fresh interpreter, as JSON.
+
+The first frame needs a display, e.g.
+`xvfb-run python benchmarks/bench_startup.py`, it is skipped otherwise."""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+MODULES = [
+    "easybox.main",
+    "easybox.cli",
+    "easybox.annotations",
+    "easybox.scanner",
+    "easybox.export",
+    "easybox.app",
+]
+
+IMPORT_CODE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start, "tkinter" in sys.modules)
+"""
+
+# Time from the start of the console script to the first drawn frame
+FIRST_FRAME_CODE = """
+import time
+start = time.perf_counter()
+from easybox.app import EasyBox
+win = EasyBox()
+win.update()
+print(time.perf_counter() - start)
+win.destroy()
+"""
+
+
+def run(code):
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return output.split()
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    result = {"imports": {}}
+    for module in MODULES:
+        times = []
+        for _ in range(args.repeat):
+            seconds, loads_tk = run(IMPORT_CODE.format(module=module))
+            times.append(float(seconds))
+        result["imports"][module] = {
+            "median_ms": 1000 * median(times),
+            "min_ms": 1000 * min(times),
+            "loads_tkinter": loads_tk == "True",
+        }
+
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        result["first_frame"] = None
+    else:
+        times = [float(run(FIRST_FRAME_CODE)[0]) for _ in range(args.repeat)]
+        result["first_frame"] = {
+            "median_ms": 1000 * median(times),
+            "min_ms": 1000 * min(times),
+        }
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
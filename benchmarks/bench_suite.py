@@ -0,0 +1,190 @@
+"""Time the hot paths of easybox on a synthetic folder, without a window,
+and print the results as JSON.
+
+Stages and the window code they stand for:
+  scan_cold, scan_warm  open_folder, without and with the folder index
+  decode                load_image_to_label
+  parse                 load_bboxes_from_file
+  save, save_writer     save_bboxes_to_file, directly and through the writer
+  redraw                resize_canvas, the final render and box transform"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+from synthetic import IMAGE_FORMATS, make_dataset
+
+import PIL
+from PIL import Image as PIL_Image
+
+from easybox.annotations import AnnotationWriter, open_store
+from easybox.config import cfg
+from easybox.loader import covers, decode_image
+from easybox.scanner import FolderScanner
+
+
+def summary(times):
+    """Statistics of per-item times in seconds."""
+    times = sorted(times)
+    total = sum(times)
+    return {
+        "items": len(times),
+        "total_s": total,
+        "mean_ms": 1000 * total / len(times),
+        "p50_ms": 1000 * times[len(times) // 2],
+        "p95_ms": 1000 * times[min(len(times) - 1, int(0.95 * len(times)))],
+        "items_per_s": len(times) / total if total > 0 else 0.0,
+    }
+
+
+def timed(fn, items):
+    times = []
+    results = []
+    for item in items:
+        start = time.perf_counter()
+        results.append(fn(item))
+        times.append(time.perf_counter() - start)
+    return summary(times), results
+
+
+def scan(folder, index_path):
+    scanner = FolderScanner(
+        folder,
+        cfg.supported_img_exts,
+        index_path=index_path,
+        batch_size=cfg.scan_batch_size,
+    )
+    start = time.perf_counter()
+    for kind, img_paths in scanner.scan():
+        if kind == "done":
+            break
+    return summary([time.perf_counter() - start]), img_paths
+
+
+def run(folder, boxes_folder, store_kind, canvas_size, resize_size):
+    """Time the stages on the images of `folder`, with the annotations and
+    the folder index in `boxes_folder`."""
+    result = {}
+    index_path = os.path.join(boxes_folder, "index.json")
+    if os.path.exists(index_path):
+        os.remove(index_path)
+    result["scan_cold"], img_paths = scan(folder, index_path)
+    result["scan_warm"], _ = scan(folder, index_path)
+    keys = [os.path.relpath(p, folder) for p in img_paths]
+
+    result["decode"], decoded = timed(
+        lambda p: decode_image(p, canvas_size, cfg.source_max_size), img_paths
+    )
+
+    store = open_store(boxes_folder, store_kind)
+    result["parse"], all_bboxes = timed(store.load, keys)
+    items = [(k, b) for k, b in zip(keys, all_bboxes) if b is not None]
+    result["save"], _ = timed(lambda item: store.save(*item), items)
+
+    writer = AnnotationWriter(store)
+    start = time.perf_counter()
+    for key, bboxes in items:
+        writer.save(key, bboxes)
+    writer.flush()
+    result["save_writer"] = summary([time.perf_counter() - start])
+    result["save_writer"]["items"] = len(items)
+    writer.close()
+
+    def redraw(entry):
+        (_, img_size, img_source), bboxes = entry
+        if covers(img_source, resize_size, img_size, cfg.source_max_size):
+            img_source.resize(resize_size, PIL_Image.LANCZOS)
+        if bboxes is not None:
+            bboxes.to_canvas(img_size[0] / resize_size[0], img_size[1] / resize_size[1])
+
+    result["redraw"], _ = timed(redraw, list(zip(decoded, all_bboxes)))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--folder",
+        help="existing folder to benchmark instead of a synthetic one, its "
+        "images are only read and its annotations are copied to a temporary "
+        "folder",
+    )
+    parser.add_argument("-n", "--count", type=int, default=100)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("-f", "--format", choices=sorted(IMAGE_FORMATS), default="jpg")
+    parser.add_argument("-b", "--boxes", type=int, default=10, help="boxes per image")
+    parser.add_argument("--store", choices=["txt", "sqlite"], default="txt")
+    parser.add_argument("--canvas", type=int, nargs=2, default=[1067, 507])
+    parser.add_argument(
+        "--resize", type=int, nargs=2, default=[800, 600], help="canvas after resize"
+    )
+    parser.add_argument("-o", "--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    params = {
+        "store": args.store,
+        "canvas": args.canvas,
+        "resize": args.resize,
+    }
+    if args.folder:
+        folder = args.folder
+        params["folder"] = folder
+        # The save stages write annotations and the scans write the index,
+        # they must not change the folder
+        tmp_folder = tempfile.mkdtemp(prefix="easybox-bench-")
+        boxes_folder = os.path.join(tmp_folder, "easybox")
+        if os.path.isdir(os.path.join(folder, "easybox")):
+            shutil.copytree(os.path.join(folder, "easybox"), boxes_folder)
+        else:
+            os.makedirs(boxes_folder)
+    else:
+        folder = tmp_folder = tempfile.mkdtemp(prefix="easybox-bench-")
+        boxes_folder = os.path.join(folder, "easybox")
+        make_dataset(
+            folder,
+            args.count,
+            (args.width, args.height),
+            args.format,
+            args.boxes,
+            args.store,
+        )
+        params.update(
+            count=args.count,
+            size=[args.width, args.height],
+            format=args.format,
+            boxes_per_image=args.boxes,
+        )
+
+    try:
+        stages = run(
+            folder, boxes_folder, args.store, tuple(args.canvas), tuple(args.resize)
+        )
+    finally:
+        shutil.rmtree(tmp_folder)
+
+    result = {
+        "params": params,
+        "environment": {
+            "python": platform.python_version(),
+            "pillow": PIL.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "stages": stages,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    else:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Generate a synthetic annotated image folder for benchmarks.
+
+Each image shows random filled rectangles on a gradient, and its
+annotation has one box per rectangle."""
+
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from PIL import Image as PIL_Image, ImageDraw
+
+from easybox.annotations import open_store
+from easybox.boxes import BoxArray
+
+IMAGE_FORMATS = {"jpg": "JPEG", "png": "PNG", "bmp": "BMP"}
+
+
+def make_image(size, boxes_per_image, rng):
+    width, height = size
+    # A gradient compresses like a photo rather than a flat color
+    img = PIL_Image.linear_gradient("L").resize(size).convert("RGB")
+    draw = ImageDraw.Draw(img)
+    bboxes = BoxArray()
+    for color_id in range(boxes_per_image):
+        left = rng.randrange(width - 8)
+        top = rng.randrange(height - 8)
+        right = rng.randrange(left + 4, min(width, left + width // 2 + 8))
+        bottom = rng.randrange(top + 4, min(height, top + height // 2 + 8))
+        draw.rectangle(
+            (left, top, right, bottom),
+            fill=(rng.randrange(256), rng.randrange(256), rng.randrange(256)),
+        )
+        bboxes.append([top, left, bottom, right, color_id])
+    return img, bboxes
+
+
+def make_dataset(
+    folder,
+    count=100,
+    size=(1920, 1080),
+    fmt="jpg",
+    boxes_per_image=10,
+    store="txt",
+    annotated=1.0,
+    seed=0,
+):
+    """Write `count` images of `size` to `folder` and annotate a fraction
+    `annotated` of them. Returns the paths of the images."""
+    if fmt not in IMAGE_FORMATS:
+        raise ValueError("Unknown image format: {}".format(fmt))
+    rng = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    annotations = open_store(os.path.join(folder, "easybox"), store)
+    img_paths = []
+    items = []
+    for idx in range(count):
+        name = "{:06d}.{}".format(idx, fmt)
+        img, bboxes = make_image(size, boxes_per_image, rng)
+        img.save(os.path.join(folder, name), IMAGE_FORMATS[fmt])
+        img_paths.append(os.path.join(folder, name))
+        if rng.random() < annotated:
+            items.append((name, bboxes))
+    annotations.save_many(items)
+    annotations.close()
+    return img_paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("folder")
+    parser.add_argument("-n", "--count", type=int, default=100)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("-f", "--format", choices=sorted(IMAGE_FORMATS), default="jpg")
+    parser.add_argument("-b", "--boxes", type=int, default=10, help="boxes per image")
+    parser.add_argument("--store", choices=["txt", "sqlite"], default="txt")
+    parser.add_argument(
+        "--annotated", type=float, default=1.0, help="fraction of annotated images"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    make_dataset(
+        args.folder,
+        args.count,
+        (args.width, args.height),
+        args.format,
+        args.boxes,
+        args.store,
+        args.annotated,
+        args.seed,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from easybox.boxes import BoxArray
+
+
+def format_bboxes(bboxes):
+    if not isinstance(bboxes, BoxArray):
+        bboxes = BoxArray(bboxes)
+    return bboxes.to_text()
+
+
+def read_bboxes(path):
+    """Read the boxes saved at `path`, None if there is no such file."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return BoxArray.from_text(f.read())
+
+
+def write_bboxes(path, bboxes):
+    """Write boxes to a temporary file and rename it to `path`, so that a
+    crash never leaves a truncated annotation file behind."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Unique, another annotator may save the same image at the same time
+    tmp_path = "{}.{}.tmp".format(path, uuid.uuid4().hex)
+    with open(tmp_path, "w") as f:
+        f.write(format_bboxes(bboxes))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class TextFileStore:
+    """Annotations stored as one `<image>.txt` file per image."""
+
+    def __init__(self, boxes_folder):
+        self.boxes_folder = boxes_folder
+
+    def path(self, key):
+        return os.path.join(self.boxes_folder, key + ".txt")
+
+    def load(self, key):
+        return read_bboxes(self.path(key))
+
+    def version(self, key):
+        """Modification time of annotation `key`, None if there is none."""
+        try:
+            return os.stat(self.path(key)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def save(self, key, bboxes):
+        write_bboxes(self.path(key), bboxes)
+
+    def save_many(self, items):
+        for key, bboxes in items:
+            self.save(key, bboxes)
+
+    def keys(self):
+        for root, dirs, files in os.walk(self.boxes_folder):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith(".txt"):
+                    path = os.path.join(root, name[: -len(".txt")])
+                    yield os.path.relpath(path, self.boxes_folder)
+
+    def items(self):
+        for key in self.keys():
+            yield key, self.load(key)
+
+    def stats(self, known=None):
+        """Modification time and number of boxes of all annotations, as a
+        dict key -> (mtime, count). Files whose mtime is the same as in
+        `known`, a previous result, are not read again."""
+        known = known or {}
+        stats = {}
+        for root, dirs, files in os.walk(self.boxes_folder):
+            for name in files:
+                if not name.endswith(".txt"):
+                    continue
+                path = os.path.join(root, name)
+                key = os.path.relpath(path[: -len(".txt")], self.boxes_folder)
+                try:
+                    mtime = os.stat(path).st_mtime
+                    if key in known and known[key][0] == mtime:
+                        stats[key] = known[key]
+                        continue
+                    with open(path, "r") as f:
+                        count = sum(1 for line in f if line.strip())
+                except OSError:
+                    continue
+                stats[key] = (mtime, count)
+        return stats
+
+    def close(self):
+        pass
+
+
+class SQLiteStore:
+    """All annotations stored in a single SQLite database, one row per image
+    with the boxes in the same text format as the `.txt` files."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS annotations "
+            "(key TEXT PRIMARY KEY, boxes TEXT NOT NULL, mtime REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def load(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT boxes FROM annotations WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return BoxArray.from_text(row[0])
+
+    def version(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT mtime FROM annotations WHERE key = ?", (key,)
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def save(self, key, bboxes):
+        self.save_many([(key, bboxes)])
+
+    def save_many(self, items):
+        now = time.time()
+        rows = ((key, format_bboxes(bboxes), now) for key, bboxes in items)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO annotations VALUES (?, ?, ?)", rows
+            )
+
+    def keys(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM annotations ORDER BY key"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def items(self):
+        # Another connection, so that saving is not blocked while iterating
+        conn = sqlite3.connect(self.db_path)
+        try:
+            for key, boxes in conn.execute(
+                "SELECT key, boxes FROM annotations ORDER BY key"
+            ):
+                yield key, BoxArray.from_text(boxes)
+        finally:
+            conn.close()
+
+    def stats(self, known=None):
+        """Same as `TextFileStore.stats`, boxes are counted by the database
+        as the number of lines."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return {
+                key: (mtime, count)
+                for key, mtime, count in conn.execute(
+                    "SELECT key, mtime, "
+                    "length(boxes) - length(replace(boxes, char(10), '')) "
+                    "FROM annotations"
+                )
+            }
+        finally:
+            conn.close()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_store(boxes_folder, kind="txt"):
+    """Open the annotations under `boxes_folder`, either stored as "txt"
+    files or in a single "sqlite" database."""
+    if kind == "txt":
+        return TextFileStore(boxes_folder)
+    if kind == "sqlite":
+        os.makedirs(boxes_folder, exist_ok=True)
+        return SQLiteStore(os.path.join(boxes_folder, "annotations.db"))
+    raise ValueError("Unknown annotation store: {}".format(kind))
+
+
+def copy_annotations(src_store, dst_store):
+    """Copy all annotations from one store to another, e.g. to import the
+    `.txt` files into a SQLite database or to export them back."""
+    dst_store.save_many(src_store.items())
+
+
+class AnnotationWriter:
+    """Save annotations to `store` on a background thread.
+
+    Saving the same image again before it is written only keeps the latest
+    boxes. Until an image is written, `pending` returns the boxes that will
+    be written, so readers never see outdated annotations. The optional
+    `on_saved` callback of `save` is called on the writer thread once the
+    boxes are written.
+
+    All the images waiting when the writer thread wakes up are written
+    with a single `store.save_many`, e.g. in one SQLite transaction."""
+
+    def __init__(self, store):
+        self.store = store
+        self.written = 0
+        self.skipped = 0
+        self.failed = {}
+        self._pending = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="easybox-writer", daemon=True
+        )
+        self._thread.start()
+
+    def save(self, key, bboxes, on_saved=None):
+        with self._cond:
+            self._pending[key] = (BoxArray(bboxes), on_saved)
+            self._cond.notify_all()
+
+    def save_many(self, items):
+        """Save (key, bboxes) pairs, e.g. boxes computed for many images."""
+        with self._cond:
+            for key, bboxes in items:
+                self._pending[key] = (BoxArray(bboxes), None)
+            self._cond.notify_all()
+
+    def skip(self):
+        self.skipped += 1
+
+    def pending(self, key):
+        with self._cond:
+            entry = self._pending.get(key)
+            return None if entry is None else entry[0].copy()
+
+    def flush(self):
+        with self._cond:
+            while self._pending:
+                self._cond.wait()
+
+    def close(self):
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self.store.close()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                batch = list(self._pending.items())
+
+            try:
+                self.store.save_many((key, entry[0]) for key, entry in batch)
+                self.written += len(batch)
+                for key, (bboxes, on_saved) in batch:
+                    if on_saved is not None:
+                        on_saved()
+            # Any error, as flush waits for the batch to leave _pending
+            except Exception as e:
+                for key, entry in batch:
+                    self.failed[key] = e
+            finally:
+                with self._cond:
+                    for key, entry in batch:
+                        # Keep the entry if it was saved again meanwhile
+                        if self._pending.get(key) is entry:
+                            del self._pending[key]
+                    self._cond.notify_all()
@@ -0,0 +1,2041 @@
+import bisect
+import os
+import queue
+import sys
+import threading
+import time
+
+from PIL import Image as PIL_Image, ImageTk
+import tkinter as tk
+from tkinter import messagebox
+from tkinter import *  # noqa
+
+from tkinter.filedialog import askdirectory, askopenfilename, asksaveasfilename
+from tkinter.simpledialog import askinteger, askstring
+
+from easybox.annotations import AnnotationWriter, open_store
+from easybox.boxes import BoxArray
+from easybox.config import cfg
+from easybox.journal import (
+    OP_ADD,
+    OP_DELETE,
+    OP_SET,
+    Journal,
+    apply_edit,
+    invert_edit,
+)
+from easybox.loader import (
+    RESAMPLE_FILTERS,
+    ImageCache,
+    Prefetcher,
+    SequenceReader,
+    covers,
+    decode_image,
+)
+from easybox.scanner import FolderScanner
+from easybox.spatial import GridIndex
+from easybox.status import StatusIndex
+from easybox.trace import Tracer
+
+# Modules of optional features, such as archives, videos, duplicates,
+# proxies, proposals, shared mode and zoom mode, are imported where the
+# feature is used so that the window starts faster.
+
+# Modifier bit of the Shift key in Tk event states
+SHIFT_MASK = 0x0001
+
+
+class EasyBox(tk.Tk):
+    def __init__(self):
+        """layout 4x8
+        |aaa|bb|
+        |aaa|bb|
+        |aaa|bb|
+        ----------
+        |ccc|dd|
+        ----------
+        |eeeee|
+        """
+        super(EasyBox, self).__init__()
+        self.cfg = cfg
+
+        # Declare global variables
+        self.folder_loaded = False
+        # Folder or archive of the images, None until one is opened
+        self.img_folder = None
+        self.img_paths = []
+        # Annotation keys of img_paths, their paths relative to img_folder
+        self.img_keys = []
+        self.scanner = None
+        self.scan_status_suffix = cfg.scan_status_suffix
+        # Queue of the background build of proxies, None when not building
+        self.proxy_queue = None
+        # Annotation state of all images, to navigate through a filter
+        self.status_index = None
+        self.nav_filter = tk.StringVar(value=cfg.nav_filter)
+        self.nav_filter_value = cfg.nav_filter_value
+        # Groups of near-duplicate images, built in background
+        self.duplicates = None
+        self.duplicate_queue = None
+        self.skip_duplicates = tk.BooleanVar(value=cfg.skip_duplicates)
+        self.img_idx = 0
+        self.num_imgs = 0
+        self.color_id = 0
+        self.bboxes = BoxArray()  # [top, left, bottom, right, color_id]
+        # Whether bboxes changed since they were loaded or saved
+        self.bboxes_dirty = False
+        # Spatial index of bboxes, to find the box under the mouse
+        self.box_index = GridIndex()
+        # Box being moved or resized with the mouse
+        self.edit_idx = None
+        self.edit_edges = ()
+        self.edit_bbox = None
+        self.edit_origin = (0, 0)
+        self.hover_idx = None
+        self.writer = None
+        # Every box edit is appended to the journal of the folder
+        self.journal = None
+        self.undo_stack = []
+        self.redo_stack = []
+
+        self.win_width = cfg.default_win_width
+        self.win_height = cfg.default_win_height
+        self.canvas_height = cfg.default_canvas_height
+        self.canvas_width = cfg.default_canvas_width
+        self.status_format = cfg.status_format
+
+        self.box_top = 0
+        self.box_bottom = 0
+        self.box_left = 0
+        self.box_right = 0
+
+        self.hor_line = None
+        self.ver_line = None
+        self.vis_rect = None
+        self.vis_move_rect = None
+        self.rubber_band_shown = False
+        # Latest mouse position of a drag and its pending redraw
+        self.motion_pos = None
+        self.motion_job = None
+        self.drag_canvas_size = (cfg.default_canvas_width, cfg.default_canvas_height)
+        self.enhance_vis_rect = None
+        self.toplevel = None
+        self.vis_rect_list = []
+
+        self.box_colors = []
+
+        # Timings of navigation and drawing, shown in the status bar with
+        # Ctrl-T
+        self.tracer = Tracer(cfg.trace_window, cfg.trace_max_events)
+        self.show_timings = False
+
+        # Filters of the first render of an image and of the render shown
+        # once idle, the same filter when there is a single render
+        self.resample_preview = RESAMPLE_FILTERS[cfg.resample_preview]
+        self.resample_final = RESAMPLE_FILTERS[cfg.resample_final]
+        if cfg.resample_policy == "fast":
+            self.resample_final = self.resample_preview
+        elif cfg.resample_policy == "quality":
+            self.resample_preview = self.resample_final
+
+        # Decoded images around the current one, shared by all navigations
+        self.img_cache = ImageCache(cfg.cache_max_items, cfg.cache_max_mb * 1024 * 1024)
+        self.prefetcher = Prefetcher(
+            self.img_cache,
+            cfg.source_max_size,
+            cfg.prefetch_radius,
+            cfg.prefetch_workers,
+            self.tracer,
+            self.resample_final,
+        )
+        self.img_item = None
+        self.img_source = None
+        self.img_resized = None
+        self.resize_preview_job = None
+        self.resize_final_job = None
+        # High quality render of an image first shown as a preview
+        self.refine_job = None
+        # Image pixel shown at the top left corner of the canvas
+        self.img_x_offset = 0
+        self.img_y_offset = 0
+
+        # Thumbnail window of all the images, see toggle_filmstrip
+        self.filmstrip = None
+
+        # Batch of images claimed by this session in shared mode, see
+        # open_leases
+        self.leases = None
+        self.batch_range = (0, 0)
+
+        # Sequence mode decodes frames in order and carries boxes over
+        self.sequence_mode = False
+        self.sequence_reader = None
+        self.keyframes = None
+
+        # Boxes proposed by the detector for the current image
+        self.proposals = None
+        self.proposal_boxes = BoxArray()
+        self.proposal_rects = []
+        self.proposal_job = None
+
+        # Zoom mode shows tiles of the image at any zoom level
+        self.zoom_mode = False
+        self.pyramid = None
+        # Whether zoom mode was turned on because the image is too large to
+        # be shown whole, it is then turned off for the next image
+        self.auto_zoom = False
+        self.zoom_render_job = None
+        self.pan_x = 0
+        self.pan_y = 0
+
+        self.title("EasyBox")
+
+        # Set default window size and offset
+        self.geometry("{}x{}+0+0".format(self.win_width, self.win_height))
+
+        # Create menu
+        menu_bar = Menu(self)
+
+        # File
+        file_menu = Menu(menu_bar, tearoff=0)
+        menu_bar.add_cascade(label="File", menu=file_menu)
+
+        file_menu.add_command(
+            label="Open", command=self.open_folder, accelerator="Ctrl+O"
+        )
+        file_menu.add_command(label="Open archive...", command=self.open_archive)
+        file_menu.add_command(label="Open video...", command=self.open_video)
+        file_menu.add_command(label="Build proxies", command=self.build_proxies)
+        file_menu.add_command(label="Export trace...", command=self.export_trace)
+        file_menu.add_command(
+            label="Exit", command=self.exit_program, accelerator="Ctrl+Q"
+        )
+
+        # Edit
+        edit_menu = Menu(menu_bar, tearoff=0)
+        menu_bar.add_cascade(label="Edit", menu=edit_menu)
+
+        edit_menu.add_command(label="Undo", command=self.undo, accelerator="Ctrl+Z")
+        edit_menu.add_command(label="Redo", command=self.redo, accelerator="Ctrl+Y")
+        edit_menu.add_command(
+            label="Accept proposals", command=self.accept_proposals, accelerator="Enter"
+        )
+        edit_menu.add_command(
+            label="Reject proposals",
+            command=self.reject_proposals,
+            accelerator="Backspace",
+        )
+        edit_menu.add_command(
+            label="Toggle keyframe", command=self.toggle_keyframe, accelerator="M"
+        )
+        edit_menu.add_command(
+            label="Interpolate keyframes",
+            command=self.interpolate_keyframes,
+            accelerator="Ctrl+I",
+        )
+        edit_menu.add_command(
+            label="Copy boxes to duplicates",
+            command=self.copy_boxes_to_duplicates,
+            accelerator="Ctrl+D",
+        )
+
+        # View
+        view_menu = Menu(menu_bar, tearoff=0)
+        menu_bar.add_cascade(label="View", menu=view_menu)
+
+        view_menu.add_command(
+            label="Zoom mode", command=self.toggle_zoom_mode, accelerator="Z"
+        )
+        view_menu.add_command(
+            label="Filmstrip", command=self.toggle_filmstrip, accelerator="F"
+        )
+        view_menu.add_command(
+            label="Next unannotated",
+            command=self.load_next_unannotated_image,
+            accelerator="N",
+        )
+        filter_menu = Menu(view_menu, tearoff=0)
+        view_menu.add_cascade(label="Navigate", menu=filter_menu)
+        for label, kind in [
+            ("All images", "all"),
+            ("Unannotated images", "unannotated"),
+            ("Images without boxes", "empty"),
+            ("Images with more than N boxes...", "min_boxes"),
+            ("Images changed since...", "changed_since"),
+        ]:
+            filter_menu.add_radiobutton(
+                label=label,
+                value=kind,
+                variable=self.nav_filter,
+                command=self.set_nav_filter,
+            )
+        view_menu.add_command(
+            label="Sequence mode",
+            command=self.toggle_sequence_mode,
+            accelerator="Alt+S",
+        )
+        view_menu.add_checkbutton(
+            label="Skip duplicates",
+            variable=self.skip_duplicates,
+            command=self.set_skip_duplicates,
+            accelerator="K",
+        )
+        view_menu.add_command(
+            label="Timings", command=self.toggle_timings, accelerator="Ctrl+T"
+        )
+
+        # Help
+        help_menu = Menu(menu_bar, tearoff=0)
+        menu_bar.add_cascade(label="Help", menu=help_menu)
+
+        help_menu.add_command(
+            label="Shortcut", command=self.open_help_window, accelerator="Ctrl+H"
+        )
+        help_menu.add_command(
+            label="About EasyBox", command=self.open_about_window, accelerator="Ctrl+A"
+        )
+
+        self.config(menu=menu_bar)
+
+        # 4x8
+        self.frm_canvas = Frame(self, bg="red").grid(
+            row=0, column=0, rowspan=3, columnspan=3
+        )
+        self.frm_box = Frame(self, bg="green").grid(
+            row=0, column=3, rowspan=3, columnspan=2
+        )
+        self.frm_info = Frame(self, bg="yellow").grid(
+            row=3, column=0, rowspan=1, columnspan=3
+        )
+        self.frm_status = Frame(self, bg="purple").grid(
+            row=4, column=0, rowspan=1, columnspan=5
+        )
+
+        # canvas that show image to annotate
+        self.canvas = Canvas(
+            self.frm_canvas, height=self.canvas_height, width=self.canvas_width
+        )
+        self.canvas.grid(row=0, column=0, rowspan=3, columnspan=3, sticky="NSEW")
+
+        # button to previous / next image
+        btn_previous = Button(
+            self.frm_info, text="Previous", fg="red", command=self.load_previous_image
+        )
+        btn_previous.grid(row=3, column=0)
+        btn_next = Button(
+            self.frm_info, text="Next", fg="green", command=self.load_next_image
+        )
+        btn_next.grid(row=3, column=1)
+        btn_save = Button(
+            self.frm_info, text="Save", fg="green", command=self.save_bboxes_to_file
+        )
+        btn_save.grid(row=3, column=2)
+
+        # box to show information of bboxes
+        self.listbox = Listbox(self.frm_box)
+        self.listbox.grid(row=0, column=3, rowspan=3, columnspan=2, sticky="NWSE")
+        self.box_label = Label(self.frm_box, text="(top, left) -> (bottom, right)")
+        self.box_label.grid(row=3, column=3, rowspan=1, columnspan=2, sticky="NW")
+
+        # image status bar
+        self.str_status = StringVar()
+        label_status = Label(self.frm_status, textvariable=self.str_status)
+        label_status.grid(row=4, column=0, rowspan=1, columnspan=5, sticky=W)
+
+        self.bind_all("<Control-q>", self.exit_program)
+        self.bind_all("<Control-o>", self.open_folder)
+        self.bind_all("<Control-h>", self.open_help_window)
+        self.bind_all("<Control-a>", self.open_about_window)
+        self.bind_all("<Escape>", self.close_toplevel)
+
+        # Movement
+        self.bind_all("<a>", self.load_previous_image)
+        self.bind_all("<d>", self.load_next_image)
+        self.bind_all("<Left>", self.load_previous_image)
+        self.bind_all("<Right>", self.load_next_image)
+        self.bind_all("<Button-2>", self.load_previous_image)
+        self.bind_all("<Button-3>", self.load_next_image)
+        self.bind_all("<Control-s>", self.save_bboxes_to_file)
+
+        # Zoom
+        self.bind_all("<z>", self.toggle_zoom_mode)
+        self.bind_all("<f>", self.toggle_filmstrip)
+        self.bind_all("<n>", self.load_next_unannotated_image)
+        self.bind_all("<k>", self.toggle_skip_duplicates)
+        self.bind_all("<Control-d>", self.copy_boxes_to_duplicates)
+        self.bind_all("<Alt-s>", self.toggle_sequence_mode)
+        self.bind_all("<m>", self.toggle_keyframe)
+        self.bind_all("<Control-i>", self.interpolate_keyframes)
+        self.canvas.bind("<MouseWheel>", self.zoom_canvas)
+        self.canvas.bind("<Button-4>", self.zoom_canvas)
+        self.canvas.bind("<Button-5>", self.zoom_canvas)
+        self.canvas.bind("<Control-Button-1>", self.pan_start)
+        self.canvas.bind("<Control-B1-Motion>", self.pan_canvas)
+        self.canvas.bind("<Control-ButtonRelease-1>", self.pan_end)
+
+        # Draw
+        self.canvas.bind("<Button-1>", self.left_mouse_click)
+        self.canvas.bind("<B1-Motion>", self.left_mouse_motion)
+        self.canvas.bind("<ButtonRelease-1>", self.left_mouse_release)
+        self.canvas.bind("<Motion>", self.mouse_hover)
+        self.canvas.bind("<Delete>", self.delete_box)
+        self.canvas.bind("<Configure>", self.resize_canvas)
+
+        # Edit
+        self.listbox.bind("<Delete>", self.delete_box_and_bbox)
+        self.bind_all("<Control-z>", self.undo)
+        self.bind_all("<Control-y>", self.redo)
+        self.bind_all("<Return>", self.accept_proposals)
+        self.bind_all("<BackSpace>", self.reject_proposals)
+        self.bind_all("<Control-t>", self.toggle_timings)
+
+        self.listbox.bind("<<ListboxSelect>>", self.on_listbox_select)
+
+        # when press 'X' on top right of window
+        self.protocol("WM_DELETE_WINDOW", self.exit_program)
+
+        self.grid_rowconfigure(0, weight=8)
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_rowconfigure(2, weight=1)
+        self.grid_columnconfigure(0, weight=2)
+        self.grid_columnconfigure(1, weight=1)
+
+    def shorten_folder(self):
+        """When the folder path is too long or window is too small,
+        shorten path for nice layout."""
+        img_folder = str(self.img_folder)
+        if len(img_folder) < self.canvas.winfo_width() / 7:
+            return img_folder
+        return img_folder[:20] + "..." + img_folder[-20:]
+
+    def update_status(self):
+        if self.img_folder is None:
+            return
+        status = self.status_format.format(
+            self.shorten_folder(), self.num_imgs, self.img_idx + 1
+        )
+        if self.scanner is not None:
+            status += self.scan_status_suffix
+        if self.proxy_queue is not None:
+            status += self.cfg.proxy_status_suffix
+        if self.sequence_mode:
+            status += self.cfg.sequence_status_suffix
+            if self.folder_loaded and self.get_img_key() in self.open_keyframes():
+                status += self.cfg.keyframe_status_suffix
+        if self.status_index is not None and self.status_index.keys:
+            status += self.cfg.index_status_format.format(
+                self.status_index.num_annotated(), len(self.status_index.keys)
+            )
+        if self.nav_filter.get() != "all":
+            status += self.cfg.filter_status_format.format(self.nav_filter.get())
+        if self.is_read_only():
+            status += self.cfg.read_only_status_suffix
+        elif self.leases is not None:
+            status += self.cfg.batch_status_format.format(
+                self.leases.batch + 1, self.batch_range[0] + 1, self.batch_range[1]
+            )
+        if self.skip_duplicates.get() and self.duplicates is not None:
+            status += self.cfg.duplicate_status_format.format(
+                self.duplicates.num_groups()
+            )
+        status += self.cfg.cache_status_format.format(
+            self.img_cache.hits, self.img_cache.misses
+        )
+        if self.writer is not None:
+            status += self.cfg.save_status_format.format(
+                self.writer.written, self.writer.skipped
+            )
+        if self.show_timings:
+            for stage in self.cfg.trace_status_stages:
+                timing = self.tracer.percentiles(stage)
+                if timing is not None:
+                    status += self.cfg.trace_status_format.format(
+                        stage, timing[0] * 1000, timing[1] * 1000
+                    )
+        self.str_status.set(status)
+
+    def toggle_timings(self, event=None):
+        self.show_timings = not self.show_timings
+        self.update_status()
+
+    def export_trace(self, event=None):
+        path = asksaveasfilename(
+            defaultextension=".json", filetypes=[("Chrome trace", "*.json")]
+        )
+        if path:
+            self.tracer.export_chrome(path)
+
+    def open_folder(self, event=None):
+        img_folder = askdirectory()
+        if img_folder:
+            self.load_folder(img_folder)
+
+    def open_archive(self, event=None):
+        from easybox.archive import ARCHIVE_EXTS
+
+        archive_path = askopenfilename(
+            filetypes=[("Archives", " ".join("*" + ext for ext in ARCHIVE_EXTS))]
+        )
+        if archive_path:
+            self.load_folder(archive_path)
+
+    def load_folder(self, img_folder):
+        """Open a folder of images, an archive of images or a video."""
+        if self.scanner is not None:
+            self.scanner.stop()
+        if self.folder_loaded:
+            self.save_bboxes_if_dirty()
+        if self.writer is not None:
+            self.close_writer()
+            self.writer = None
+
+        if self.prefetcher.source is not None:
+            self.prefetcher.source.close()
+            self.prefetcher.source = None
+
+        video_path = archive_path = None
+        if not os.path.isdir(img_folder):
+            from easybox.archive import is_archive
+            from easybox.sequence import frames_folder, is_video
+
+            if is_video(img_folder):
+                # Frames are decoded to images, annotated like a folder
+                video_path, img_folder = img_folder, frames_folder(img_folder)
+            elif is_archive(img_folder):
+                archive_path = img_folder
+        self.img_folder = img_folder
+        self.boxes_folder = os.path.join(self.img_folder, "easybox")
+        if archive_path is not None:
+            from easybox.archive import annotation_folder
+
+            self.boxes_folder = annotation_folder(img_folder)
+        self.prefetcher.proxies = None
+        if cfg.use_proxies and archive_path is None:
+            from easybox.proxy import ProxyCache, proxy_folder
+
+            self.prefetcher.proxies = ProxyCache(
+                proxy_folder(self.img_folder), cfg.proxy_max_size, cfg.proxy_quality
+            )
+        self.img_paths = []
+        self.img_keys = []
+        self.img_idx = 0
+        self.num_imgs = 0
+        self.folder_loaded = False
+        self.duplicates = None
+        self.duplicate_queue = None
+        if self.filmstrip is not None:
+            self.filmstrip.reset()
+
+        # Scan the folder in background and show the first image as soon
+        # as it is found
+        self.scan_status_suffix = cfg.scan_status_suffix
+        if video_path is not None:
+            from easybox.sequence import VideoSource
+
+            scanner = VideoSource(
+                video_path, cfg.ffmpeg, cfg.video_frame_quality, cfg.scan_batch_size
+            )
+            self.scan_status_suffix = cfg.video_status_suffix
+        elif archive_path is not None:
+            from easybox.archive import ArchiveSource
+
+            scanner = self.prefetcher.source = ArchiveSource(
+                self.img_folder,
+                cfg.supported_img_exts,
+                index_path=os.path.join(self.boxes_folder, "index.json"),
+            )
+        else:
+            scanner = FolderScanner(
+                self.img_folder,
+                cfg.supported_img_exts,
+                recursive=cfg.scan_recursive,
+                index_path=os.path.join(self.boxes_folder, "index.json"),
+                batch_size=cfg.scan_batch_size,
+            )
+        self.scanner = scanner
+        scan_queue = queue.Queue()
+
+        def scan():
+            try:
+                for msg in scanner.scan():
+                    scan_queue.put(msg)
+            except (OSError, ValueError) as e:
+                scan_queue.put(("error", e))
+
+        threading.Thread(target=scan, daemon=True).start()
+        self.after(cfg.scan_poll_ms, self.poll_scanner, scanner, scan_queue)
+
+    def poll_scanner(self, scanner, scan_queue):
+        if scanner is not self.scanner:
+            return
+        done = False
+        try:
+            while not scan_queue.empty():
+                kind, img_paths = scan_queue.get()
+                if kind == "add":
+                    # Merging two sorted runs is linear time for sorted()
+                    self.set_img_paths(sorted(self.img_paths + sorted(img_paths)))
+                elif kind == "error":
+                    self.scanner = None
+                    messagebox.showerror(
+                        title="Error",
+                        message="Failed to list images:\n{}".format(img_paths),
+                    )
+                    return
+                else:
+                    done = True
+                    self.set_img_paths(img_paths)
+        except Exception:
+            # E.g. a broken image, report it like Tk does but keep polling,
+            # the scan must still finish
+            self.report_callback_exception(*sys.exc_info())
+
+        if not done:
+            self.after(cfg.scan_poll_ms, self.poll_scanner, scanner, scan_queue)
+            return
+        self.scanner = None
+        if self.num_imgs < 1:
+            messagebox.showinfo(title="Info", message="No images in this folder!")
+        else:
+            self.bind_status_index()
+            if self.skip_duplicates.get():
+                self.build_duplicates()
+            if cfg.shared_mode:
+                self.open_leases()
+            self.update_status()
+
+    def open_leases(self):
+        """Share the folder with other annotators: claim a batch of images
+        and only navigate in it."""
+        from easybox.leases import LeaseManager
+
+        leases = self.leases = LeaseManager(
+            self.boxes_folder, cfg.lease_batch_size, cfg.lease_timeout_s
+        )
+        leases.load_batches(self.img_keys)
+        self.claim_batch()
+        self.after(cfg.lease_renew_s * 1000, self.renew_lease, leases)
+
+    def claim_batch(self):
+        while True:
+            if self.leases.claim() is None:
+                self.batch_range = (0, 0)
+                self.update_status()
+                messagebox.showinfo(
+                    title="Info",
+                    message="All batches are done or claimed by other annotators.",
+                )
+                return
+            self.batch_range = self.leases.batch_range(self.img_keys)
+            if self.batch_range[0] < self.batch_range[1]:
+                break
+            # All the images of this batch were removed
+            self.leases.finish()
+        self.jump_to(self.batch_range[0])
+
+    def renew_lease(self, leases):
+        if leases is not self.leases:
+            return
+        if not leases.renew():
+            leases.batch = None
+            messagebox.showwarning(
+                title="Warning",
+                message="Your batch was claimed by another annotator after a "
+                "timeout, claiming another one.",
+            )
+            self.claim_batch()
+        self.after(cfg.lease_renew_s * 1000, self.renew_lease, leases)
+
+    def is_read_only(self):
+        """Whether boxes cannot be changed: in shared mode, until a batch is
+        claimed and when no batch is left. Changes made when the batch was
+        claimed by another annotator are not saved."""
+        return cfg.shared_mode and (self.leases is None or self.leases.batch is None)
+
+    def in_batch(self, idx):
+        """Whether image `idx` can be shown, i.e. is in the claimed batch in
+        shared mode."""
+        return self.leases is None or self.batch_range[0] <= idx < self.batch_range[1]
+
+    def open_status_index(self):
+        """Read the annotation state of all images in background."""
+        status_index = self.status_index = StatusIndex(
+            self.writer.store, os.path.join(self.boxes_folder, "status.json")
+        )
+        threading.Thread(target=status_index.refresh, daemon=True).start()
+        self.after(cfg.scan_poll_ms, self.poll_status_index, status_index)
+
+    def poll_status_index(self, status_index):
+        if status_index is not self.status_index:
+            return
+        if not status_index.ready:
+            self.after(cfg.scan_poll_ms, self.poll_status_index, status_index)
+            return
+        self.bind_status_index()
+        self.update_status()
+
+    def bind_status_index(self):
+        # Wait for both the state and the full list of images
+        if self.status_index is None or not self.status_index.ready:
+            return
+        if self.scanner is not None:
+            return
+        self.status_index.bind(self.img_keys)
+
+    def set_nav_filter(self):
+        kind = self.nav_filter.get()
+        if kind == "min_boxes":
+            value = askinteger(
+                "Navigate", "Show images with more than N boxes, N:", minvalue=0
+            )
+        elif kind == "changed_since":
+            value = askstring("Navigate", "Show images changed since (YYYY-MM-DD):")
+            try:
+                value = time.mktime(time.strptime(value, "%Y-%m-%d"))
+            except (TypeError, ValueError):
+                value = None
+        else:
+            value = 0
+        if value is None:
+            self.nav_filter.set("all")
+            value = 0
+        self.nav_filter_value = value
+        self.update_status()
+
+    def find_image(self, step, kind=None):
+        """Position of the previous (step -1) or next (step 1) image passing
+        the navigation filter, None if there is none. Only the first image
+        of each group of duplicates is found when duplicates are skipped."""
+        kind = kind or self.nav_filter.get()
+        index = self.status_index
+        if index is not None and len(index.keys) != self.num_imgs:
+            index = None
+        duplicates = self.duplicates if self.skip_duplicates.get() else None
+        idx = self.img_idx
+        while True:
+            if kind == "all" or index is None:
+                idx += step
+                if not 0 <= idx < self.num_imgs:
+                    return None
+            else:
+                idx = index.next_match(idx, kind, self.nav_filter_value, step)
+            if idx is not None and not self.in_batch(idx):
+                return None
+            if idx is None or duplicates is None or duplicates.is_representative(idx):
+                return idx
+
+    def toggle_skip_duplicates(self, event=None):
+        self.skip_duplicates.set(not self.skip_duplicates.get())
+        self.set_skip_duplicates()
+
+    def set_skip_duplicates(self):
+        if self.skip_duplicates.get() and self.folder_loaded:
+            self.build_duplicates()
+        self.update_status()
+
+    def build_duplicates(self):
+        """Hash the images of the folder in background and group the
+        near-duplicates, once the scan is finished."""
+        if self.duplicates is not None or self.duplicate_queue is not None:
+            return
+        if self.scanner is not None:
+            return
+        if self.prefetcher.source is not None:
+            self.skip_duplicates.set(False)
+            messagebox.showinfo(
+                title="Info", message="Duplicates are not found in archives."
+            )
+            return
+        import multiprocessing
+
+        from easybox.dedup import DuplicateIndex
+
+        duplicates = DuplicateIndex(
+            os.path.join(self.boxes_folder, "hashes.json"),
+            cfg.duplicate_hash_size,
+            cfg.duplicate_max_distance,
+        )
+        img_paths = self.img_paths
+        keys = self.img_keys
+        duplicate_queue = self.duplicate_queue = queue.Queue()
+
+        def build():
+            try:
+                duplicates.build(
+                    img_paths, keys, mp_context=multiprocessing.get_context("spawn")
+                )
+            # Always post a result, poll_duplicates waits for it
+            except Exception as e:
+                duplicate_queue.put(e)
+                return
+            duplicate_queue.put(duplicates)
+
+        threading.Thread(target=build, daemon=True).start()
+        self.after(cfg.scan_poll_ms, self.poll_duplicates, img_paths, duplicate_queue)
+
+    def poll_duplicates(self, img_paths, duplicate_queue):
+        if duplicate_queue is not self.duplicate_queue:
+            return
+        if duplicate_queue.empty():
+            self.after(
+                cfg.scan_poll_ms, self.poll_duplicates, img_paths, duplicate_queue
+            )
+            return
+        self.duplicate_queue = None
+        duplicates = duplicate_queue.get()
+        if isinstance(duplicates, Exception):
+            messagebox.showerror(
+                title="Error",
+                message="Failed to find duplicates:\n{}".format(duplicates),
+            )
+            return
+        if img_paths is self.img_paths:
+            self.duplicates = duplicates
+            self.update_status()
+
+    def copy_boxes_to_duplicates(self, event=None):
+        """Replace the boxes of all the images of the group of the current
+        image with the boxes of the first image of the group."""
+        if not self.folder_loaded or self.is_read_only():
+            return
+        if self.duplicates is None:
+            messagebox.showinfo(
+                title="Info", message="Enable View->Skip duplicates first."
+            )
+            return
+        members = [
+            idx for idx in self.duplicates.members(self.img_idx) if self.in_batch(idx)
+        ]
+        if len(members) < 2:
+            messagebox.showinfo(title="Info", message="This image has no duplicate.")
+            return
+        if not messagebox.askyesno(
+            title="Copy boxes",
+            message="Replace the boxes of {} duplicates with the boxes of "
+            "the first image of the group?".format(len(members) - 1),
+        ):
+            return
+        if self.bboxes_dirty:
+            self.save_bboxes_to_file()
+
+        bboxes = self.read_boxes(self.img_keys[members[0]])
+        now = time.time()
+        for idx in members[1:]:
+            key = self.img_keys[idx]
+            self.writer.save(key, BoxArray(bboxes))
+            if self.status_index is not None:
+                self.status_index.set(key, len(bboxes), now)
+            if self.filmstrip is not None:
+                self.filmstrip.set_annotated(self.img_paths[idx], True)
+        if self.img_idx != members[0]:
+            # The current image is one of the duplicates
+            self.reload_boxes()
+
+    def read_boxes(self, key):
+        """Boxes of image `key`, including the ones waiting to be written."""
+        bboxes = self.writer.pending(key)
+        if bboxes is None:
+            bboxes = self.writer.store.load(key) or BoxArray()
+        return bboxes
+
+    def reload_boxes(self):
+        """Show the boxes of the current image again, after they were saved
+        from another image."""
+        for vis_rect in self.vis_rect_list:
+            self.canvas.delete(vis_rect)
+        if self.enhance_vis_rect is not None:
+            self.canvas.delete(self.enhance_vis_rect)
+            self.enhance_vis_rect = None
+        self.listbox.delete(0, END)
+        self.load_bboxes_from_file()
+
+    def build_proxies(self, event=None):
+        """Build the missing proxies of the folder in background."""
+        if not self.folder_loaded or self.proxy_queue is not None:
+            return
+        if self.prefetcher.source is not None:
+            messagebox.showinfo(
+                title="Info", message="Proxies are not used for archives."
+            )
+            return
+        if self.scanner is not None:
+            messagebox.showinfo(
+                title="Info", message="Wait for the folder scan to finish first."
+            )
+            return
+        import multiprocessing
+
+        from easybox.proxy import ProxyCache, proxy_folder
+
+        proxies = ProxyCache(
+            proxy_folder(self.img_folder), cfg.proxy_max_size, cfg.proxy_quality
+        )
+        img_paths = list(self.img_paths)
+        proxy_queue = self.proxy_queue = queue.Queue()
+
+        def build():
+            try:
+                stats = proxies.build(
+                    img_paths, mp_context=multiprocessing.get_context("spawn")
+                )
+            # Always post a result, poll_proxies waits for it
+            except Exception as e:
+                stats = e
+            proxy_queue.put(stats)
+
+        threading.Thread(target=build, daemon=True).start()
+        self.update_status()
+        self.after(cfg.scan_poll_ms, self.poll_proxies, proxy_queue)
+
+    def poll_proxies(self, proxy_queue):
+        if proxy_queue.empty():
+            self.after(cfg.scan_poll_ms, self.poll_proxies, proxy_queue)
+            return
+        stats = proxy_queue.get()
+        if proxy_queue is self.proxy_queue:
+            self.proxy_queue = None
+            self.update_status()
+        if isinstance(stats, Exception):
+            messagebox.showerror(
+                title="Error", message="Failed to build proxies:\n{}".format(stats)
+            )
+            return
+        messagebox.showinfo(
+            title="Info",
+            message="Built {} proxies, {} up to date, {} failed".format(
+                stats["built"], stats["up_to_date"], len(stats["errors"])
+            ),
+        )
+
+    def set_img_paths(self, img_paths):
+        cur_img_path = self.img_paths[self.img_idx] if self.folder_loaded else None
+        self.img_paths = img_paths
+        self.img_keys = [os.path.relpath(p, self.img_folder) for p in img_paths]
+        self.num_imgs = len(img_paths)
+        if self.num_imgs < 1:
+            self.folder_loaded = False
+            self.canvas.delete("all")
+            return
+
+        if cur_img_path is None:
+            if not os.path.exists(self.boxes_folder):
+                os.makedirs(self.boxes_folder)
+            if self.writer is None:
+                self.writer = AnnotationWriter(
+                    open_store(self.boxes_folder, cfg.annotation_store)
+                )
+                self.open_journal()
+                self.open_status_index()
+                self.open_proposals()
+                self.keyframes = None
+            self.img_idx = 0
+        else:
+            # Stay on the current image when images are found before it
+            self.img_idx = bisect.bisect_left(img_paths, cur_img_path)
+            if self.img_idx < self.num_imgs and img_paths[self.img_idx] == cur_img_path:
+                self.update_status()
+                if self.filmstrip is not None:
+                    self.filmstrip.render()
+                return
+            self.img_idx = min(self.img_idx, self.num_imgs - 1)
+
+        # Set first, so that other images can be shown if this one fails
+        self.folder_loaded = True
+        self.show_image()
+        self.update_status()
+        if self.filmstrip is not None:
+            self.filmstrip.render()
+
+    def show_image(self):
+        """Show the current image and its boxes. The boxes are loaded even
+        if the image fails to show, so that they are never saved over."""
+        try:
+            self.load_image_to_label()
+        finally:
+            self.load_bboxes_from_file()
+
+    def load_image_to_label(self):
+        with self.tracer.span("image"):
+            self.canvas.delete("all")
+            self.img_item = self.canvas.create_image(0, 0, anchor=NW)
+            # Before decoding, a failed image must not keep the boxes of the
+            # previous one
+            self.listbox.delete(0, END)
+            self.color_id = -1
+            self.bboxes = BoxArray()
+            self.vis_rect_list = []
+            self.enhance_vis_rect = None
+            self.proposal_rects = []
+            if self.auto_zoom:
+                self.zoom_mode = self.auto_zoom = False
+            if self.zoom_mode:
+                self.open_pyramid()
+            else:
+                self.fit_image()
+
+    def fit_image(self, allow_zoom=True):
+        """Show the whole image resized to the canvas. Images too large to
+        be decoded whole are shown in zoom mode, if `allow_zoom`."""
+        if self.pyramid is not None:
+            self.pyramid.close()
+            self.pyramid = None
+        if self.refine_job is not None:
+            self.after_cancel(self.refine_job)
+            self.refine_job = None
+        canvas_size = (self.canvas.winfo_width(), self.canvas.winfo_height())
+        img_path = self.img_paths[self.img_idx]
+        preview = self.resample_preview != self.resample_final
+        try:
+            img_resized, img_size, self.img_source = self.prefetcher.get(
+                img_path, canvas_size, self.resample_preview if preview else None
+            )
+        except PIL_Image.DecompressionBombError:
+            if not allow_zoom:
+                raise
+            # Zoom mode only decodes the tiles it shows
+            self.zoom_mode = self.auto_zoom = True
+            self.open_pyramid()
+            return
+        self.img_width, self.img_height = img_size
+        self.show_resized_image(img_resized)
+        # Images that were not prefetched are first shown as a preview, so
+        # that drawing can start, then rendered again in high quality
+        if preview and (img_path, canvas_size) not in self.img_cache:
+            self.refine_job = self.after_idle(self.refine_image, img_path)
+
+        # Decode the neighbors while the user is annotating this image
+        self.schedule_decode(canvas_size)
+
+    def schedule_decode(self, canvas_size):
+        """Decode the next frames in sequence mode, the neighbors of the
+        current image otherwise."""
+        if self.sequence_reader is not None:
+            self.sequence_reader.seek(self.img_paths, self.img_idx, canvas_size)
+        else:
+            self.prefetcher.schedule(self.img_paths, self.img_idx, canvas_size)
+
+    def show_resized_image(self, img_resized):
+        self.img_resized = img_resized
+        self.img_width_ratio = self.img_width / img_resized.width
+        self.img_height_ratio = self.img_height / img_resized.height
+        self.img_x_offset = 0
+        self.img_y_offset = 0
+        self.show_photo(img_resized)
+
+    def show_photo(self, img):
+        with self.tracer.span("photo"):
+            self.img_photo = ImageTk.PhotoImage(img)
+        self.canvas.itemconfig(self.img_item, image=self.img_photo)
+        # Tk draws the canvas on idle, before this callback runs
+        start = time.perf_counter()
+        self.after_idle(
+            lambda: self.tracer.add("paint", start, time.perf_counter() - start)
+        )
+
+    def box_to_canvas(self, bbox):
+        """Canvas coordinates (x0, y0, x1, y1) of a box in image pixels."""
+        return (
+            (bbox[1] - self.img_x_offset) / self.img_width_ratio,
+            (bbox[0] - self.img_y_offset) / self.img_height_ratio,
+            (bbox[3] - self.img_x_offset) / self.img_width_ratio,
+            (bbox[2] - self.img_y_offset) / self.img_height_ratio,
+        )
+
+    def open_pyramid(self):
+        # Only needed in zoom mode, not imported at startup
+        from easybox.tiles import TilePyramid
+
+        if self.pyramid is not None:
+            self.pyramid.close()
+            self.pyramid = None
+        self.img_source = None
+        try:
+            self.pyramid = TilePyramid(
+                self.img_paths[self.img_idx],
+                os.path.join(self.boxes_folder, "tiles"),
+                cfg.zoom_tile_size,
+                cfg.zoom_max_tiles,
+                self.prefetcher.source,
+                cfg.zoom_max_pixels,
+            )
+        except Exception as e:
+            self.leave_zoom_mode(e)
+            return
+        self.img_width, self.img_height = self.pyramid.size
+        # Start with the whole image visible
+        canvas_w, canvas_h = self.canvas.winfo_width(), self.canvas.winfo_height()
+        scale = max(self.img_width / canvas_w, self.img_height / canvas_h)
+        self.img_width_ratio = self.img_height_ratio = scale
+        self.img_x_offset = 0
+        self.img_y_offset = 0
+        self.render_tiles()
+
+    def render_tiles(self):
+        self.zoom_render_job = None
+        if self.pyramid is None:
+            return
+        canvas_size = (self.canvas.winfo_width(), self.canvas.winfo_height())
+        with self.tracer.span("tiles"):
+            view, complete = self.pyramid.render(
+                self.img_x_offset,
+                self.img_y_offset,
+                self.img_width_ratio,
+                canvas_size,
+                PIL_Image.BILINEAR,
+            )
+        self.img_resized = view
+        self.show_photo(view)
+        if self.pyramid.error is not None:
+            self.leave_zoom_mode(self.pyramid.error)
+            self.redraw_boxes()
+        elif not complete and self.zoom_render_job is None:
+            # Show the finer tiles once they are built
+            self.zoom_render_job = self.after(cfg.zoom_poll_ms, self.render_tiles)
+
+    def leave_zoom_mode(self, error):
+        """Show the whole image again after the tiles of the image failed to
+        build, or nothing if it is too large for that too."""
+        self.zoom_mode = self.auto_zoom = False
+        try:
+            self.fit_image(allow_zoom=False)
+        except (OSError, PIL_Image.DecompressionBombError):
+            self.canvas.itemconfig(self.img_item, image="")
+        messagebox.showerror(
+            title="Error",
+            message="Failed to open the image in zoom mode:\n{}".format(error),
+        )
+
+    def schedule_render_tiles(self):
+        if self.zoom_render_job is not None:
+            self.after_cancel(self.zoom_render_job)
+        self.zoom_render_job = self.after_idle(self.render_tiles)
+
+    def toggle_zoom_mode(self, event=None):
+        if not self.folder_loaded:
+            return
+        self.zoom_mode = not self.zoom_mode
+        self.auto_zoom = False
+        if self.zoom_mode:
+            self.open_pyramid()
+        else:
+            self.fit_image()
+        self.redraw_boxes()
+
+    def zoom_canvas(self, event=None):
+        if not self.zoom_mode or self.pyramid is None:
+            return
+        if event.num == 4 or event.delta > 0:
+            factor = 1 / cfg.zoom_step
+        else:
+            factor = cfg.zoom_step
+        canvas_w, canvas_h = self.canvas.winfo_width(), self.canvas.winfo_height()
+        max_scale = max(self.img_width / canvas_w, self.img_height / canvas_h)
+        scale = self.img_width_ratio * factor
+        scale = max(1 / cfg.zoom_max, min(scale, max_scale))
+
+        # Keep the image pixel under the mouse at the same place
+        img_x = self.img_x_offset + event.x * self.img_width_ratio
+        img_y = self.img_y_offset + event.y * self.img_height_ratio
+        self.img_width_ratio = self.img_height_ratio = scale
+        self.img_x_offset = img_x - event.x * scale
+        self.img_y_offset = img_y - event.y * scale
+        self.schedule_render_tiles()
+        self.redraw_boxes()
+
+    def pan_start(self, event=None):
+        self.pan_x, self.pan_y = event.x, event.y
+
+    def pan_canvas(self, event=None):
+        if not self.zoom_mode or self.pyramid is None:
+            return
+        self.img_x_offset -= (event.x - self.pan_x) * self.img_width_ratio
+        self.img_y_offset -= (event.y - self.pan_y) * self.img_height_ratio
+        self.pan_x, self.pan_y = event.x, event.y
+        self.schedule_render_tiles()
+        self.redraw_boxes()
+
+    def pan_end(self, event=None):
+        # Nothing to do, but the release must not end a box drawing
+        pass
+
+    def open_journal(self):
+        """Open the edit journal of the folder and apply the edits that were
+        not saved, e.g. because of a crash."""
+        journal_folder = self.boxes_folder
+        if cfg.shared_mode:
+            from easybox.leases import session_name
+
+            # Each annotator has its own journal
+            journal_folder = os.path.join(self.boxes_folder, "journals", session_name())
+            os.makedirs(journal_folder, exist_ok=True)
+        self.journal = Journal(journal_folder, cfg.journal_fsync)
+        recovered = self.journal.compact(self.writer.store)
+        if recovered:
+            messagebox.showinfo(
+                title="Info",
+                message="Recovered unsaved edits of {} images".format(len(recovered)),
+            )
+
+    def compact_journal(self):
+        # Edits being written are not in the store yet
+        self.writer.flush()
+        self.journal.compact(self.writer.store)
+
+    def record_edit(self, op, idx, old=None, new=None):
+        """Journal an edit of the current boxes, which was already applied."""
+        self.journal.append(self.get_img_key(), op, idx, old, new)
+        self.undo_stack.append((op, idx, old, new))
+        self.redo_stack = []
+        self.bboxes_dirty = True
+
+    def replay_edit(self, op, idx, old, new):
+        self.journal.append(self.get_img_key(), op, idx, old, new)
+        apply_edit(self.bboxes, op, idx, old, new)
+        self.bboxes_dirty = True
+        self.refresh_boxes()
+
+    def undo(self, event=None):
+        if not self.folder_loaded or self.edit_idx is not None or self.is_read_only():
+            return
+        if self.undo_stack:
+            edit = self.undo_stack.pop()
+            self.redo_stack.append(edit)
+            self.replay_edit(*invert_edit(*edit))
+
+    def redo(self, event=None):
+        if not self.folder_loaded or self.edit_idx is not None or self.is_read_only():
+            return
+        if self.redo_stack:
+            edit = self.redo_stack.pop()
+            self.undo_stack.append(edit)
+            self.replay_edit(*edit)
+
+    def get_img_key(self):
+        return self.img_keys[self.img_idx]
+
+    def save_bboxes_to_file(self, event=None):
+        if not self.folder_loaded or self.is_read_only():
+            return
+        key = self.get_img_key()
+        leases, store = self.leases, self.writer.store
+        if (
+            leases is not None
+            and self.writer.pending(key) is None
+            and leases.is_stale(store, key)
+        ):
+            if not messagebox.askyesno(
+                title="Conflict",
+                message="{} was changed by another annotator since it was "
+                "opened. Overwrite these changes?".format(key),
+            ):
+                self.reload_boxes()
+                return
+        # The saved boxes include all the journal records so far
+        journal, count = self.journal, len(self.journal)
+
+        def on_saved():
+            journal.mark_saved(key, count)
+            if leases is not None:
+                # This write is not a change of another annotator
+                leases.remember(key, store.version(key))
+
+        self.writer.save(key, self.bboxes, on_saved)
+        self.bboxes_dirty = False
+        if self.status_index is not None:
+            self.status_index.set(key, len(self.bboxes), time.time())
+        if self.filmstrip is not None:
+            self.filmstrip.set_annotated(self.img_paths[self.img_idx], True)
+
+    def save_bboxes_if_dirty(self):
+        """Save boxes of the current image only if they were changed."""
+        with self.tracer.span("save"):
+            if self.bboxes_dirty:
+                self.save_bboxes_to_file()
+            else:
+                self.writer.skip()
+            if len(self.journal) >= cfg.journal_compact_records:
+                self.compact_journal()
+
+    def load_bboxes_from_file(self):
+        with self.tracer.span("boxes"):
+            img_key = self.get_img_key()
+            # Boxes waiting to be written are newer than the stored ones
+            bboxes = self.writer.pending(img_key)
+            if bboxes is None:
+                if self.leases is not None:
+                    self.leases.remember(img_key, self.writer.store.version(img_key))
+                bboxes = self.writer.store.load(img_key) or BoxArray()
+            self.bboxes = bboxes
+            self.draw_boxes()
+            self.rebuild_box_index()
+            if len(bboxes) > 0:
+                self.color_id = max(self.color_id, int(max(bboxes.column(4))))
+            # Use next color
+            self.color_id += 1
+            self.bboxes_dirty = False
+            self.undo_stack = []
+            self.redo_stack = []
+        self.draw_proposals()
+        if self.proposals is not None:
+            self.schedule_proposals()
+
+    def draw_boxes(self):
+        """Create the canvas rectangles and listbox entries of all boxes."""
+        with self.tracer.span("draw_boxes"):
+            colors = [self.cfg.box_colors[int(c)] for c in self.bboxes.column(4)]
+            coords = self.bboxes.to_canvas(
+                self.img_width_ratio,
+                self.img_height_ratio,
+                self.img_x_offset,
+                self.img_y_offset,
+            )
+            create_rectangle = self.canvas.create_rectangle
+            self.vis_rect_list = [
+                create_rectangle(*xy, width=self.cfg.box_width, outline=color)
+                for xy, color in zip(coords, colors)
+            ]
+
+            # Insert all entries with a single call
+            labels = [
+                "(%d, %d) -> (%d, %d)" % box
+                for box in zip(*[self.bboxes.column(i) for i in range(4)])
+            ]
+            if labels:
+                self.listbox.insert(END, *labels)
+            for idx, color in enumerate(colors):
+                self.listbox.itemconfig(idx, fg=color)
+
+    def refresh_boxes(self):
+        """Draw all boxes again after they changed."""
+        for vis_rect in self.vis_rect_list:
+            self.canvas.delete(vis_rect)
+        if self.enhance_vis_rect is not None:
+            self.canvas.delete(self.enhance_vis_rect)
+            self.enhance_vis_rect = None
+        self.listbox.delete(0, END)
+        self.draw_boxes()
+        self.rebuild_box_index()
+
+    def open_proposals(self):
+        """Start the detector of the folder, if one is configured."""
+        self.proposals = None
+        if cfg.detector:
+            import multiprocessing
+
+            from easybox.proposals import ProposalRunner
+
+            self.proposals = ProposalRunner(
+                os.path.join(self.boxes_folder, "proposals"),
+                cfg.detector,
+                cfg.detector_jobs,
+                multiprocessing.get_context("spawn"),
+            )
+
+    def schedule_proposals(self):
+        """Run the detector on the current image and the next ones, whose
+        proposals are then ready when the annotator gets there."""
+        source = self.prefetcher.source
+        items = []
+        last_idx = min(self.num_imgs, self.img_idx + cfg.detector_ahead + 1)
+        for path in self.img_paths[self.img_idx : last_idx]:
+            image = path
+            if source is not None:
+                # Only read members that are not detected yet
+                image = lambda path=path: source.read(source.member_name(path))
+            items.append((os.path.relpath(path, self.img_folder), image))
+        self.proposals.schedule(items)
+        if self.proposal_job is None and self.proposals.pending():
+            self.proposal_job = self.after(cfg.scan_poll_ms, self.poll_proposals)
+
+    def poll_proposals(self):
+        self.proposal_job = None
+        if self.proposals is None:
+            return
+        key = self.get_img_key() if self.folder_loaded else None
+        while not self.proposals.done.empty():
+            if self.proposals.done.get() == key:
+                self.draw_proposals()
+        if self.proposals.pending():
+            self.proposal_job = self.after(cfg.scan_poll_ms, self.poll_proposals)
+
+    def draw_proposals(self):
+        """Show the proposals of the current image as dashed boxes."""
+        for rect in self.proposal_rects:
+            self.canvas.delete(rect)
+        self.proposal_rects = []
+        self.proposal_boxes = BoxArray()
+        if self.proposals is None:
+            return
+        self.proposal_boxes = self.proposals.load(self.get_img_key()) or BoxArray()
+        coords = self.proposal_boxes.to_canvas(
+            self.img_width_ratio,
+            self.img_height_ratio,
+            self.img_x_offset,
+            self.img_y_offset,
+        )
+        self.proposal_rects = [
+            self.canvas.create_rectangle(
+                *xy,
+                width=cfg.box_width,
+                outline=cfg.proposal_color,
+                dash=cfg.proposal_dash,
+            )
+            for xy in coords
+        ]
+
+    def is_typing(self, event):
+        """Whether key `event` is typed in a text field, e.g. of a dialog,
+        rather than a shortcut."""
+        return event is not None and isinstance(event.widget, (Entry, Text))
+
+    def accept_proposals(self, event=None):
+        """Add all the proposals of the current image to its boxes."""
+        if self.is_typing(event) or self.is_read_only():
+            return
+        if not self.folder_loaded or len(self.proposal_boxes) < 1:
+            return
+        for bbox in self.proposal_boxes:
+            bbox[4] = self.color_id
+            self.bboxes.append(bbox)
+            self.record_edit(OP_ADD, len(self.bboxes) - 1, new=self.bboxes[-1])
+            self.color_id = (self.color_id + 1) % len(self.cfg.box_colors)
+        self.refresh_boxes()
+        self.reject_proposals()
+
+    def reject_proposals(self, event=None):
+        """Drop all the proposals of the current image."""
+        if self.is_typing(event) or self.is_read_only():
+            return
+        if not self.folder_loaded or len(self.proposal_boxes) < 1:
+            return
+        self.proposals.discard(self.get_img_key())
+        self.draw_proposals()
+
+    def rebuild_box_index(self):
+        cell_size = max(self.img_width, self.img_height) / cfg.index_grid_cells
+        self.box_index.rebuild(self.bboxes, cell_size)
+        self.hover_idx = None
+
+    def canvas_to_image(self, x, y):
+        """Image pixel under canvas point (x, y), clamped to the image."""
+        img_x = self.img_x_offset + x * self.img_width_ratio
+        img_y = self.img_y_offset + y * self.img_height_ratio
+        return (
+            max(0, min(img_x, self.img_width)),
+            max(0, min(img_y, self.img_height)),
+        )
+
+    def find_box(self, x, y):
+        """Box under canvas point (x, y), see GridIndex.hit_test."""
+        img_x, img_y = self.canvas_to_image(x, y)
+        tolerance = cfg.edit_handle_size * max(
+            self.img_width_ratio, self.img_height_ratio
+        )
+        return self.box_index.hit_test(self.bboxes, img_x, img_y, tolerance)
+
+    def mouse_hover(self, event=None):
+        if not self.folder_loaded:
+            return
+        idx, edges = self.find_box(event.x, event.y)
+        if not edges:
+            idx = None
+        if idx != self.hover_idx:
+            # Highlight the box that would be resized by a click
+            if self.hover_idx is not None and self.hover_idx < len(self.vis_rect_list):
+                self.canvas.itemconfig(
+                    self.vis_rect_list[self.hover_idx], width=cfg.box_width
+                )
+            if idx is not None:
+                self.canvas.itemconfig(
+                    self.vis_rect_list[idx], width=cfg.enhance_box_width
+                )
+            self.hover_idx = idx
+        if len(edges) == 2:
+            cursor = "sizing"
+        elif edges and edges[0] in ("top", "bottom"):
+            cursor = "sb_v_double_arrow"
+        elif edges:
+            cursor = "sb_h_double_arrow"
+        elif event.state & SHIFT_MASK and idx is not None:
+            cursor = "fleur"
+        else:
+            cursor = ""
+        self.canvas.config(cursor=cursor)
+
+    def select_box(self, idx):
+        self.listbox.selection_clear(0, END)
+        self.listbox.selection_set(idx)
+        self.listbox.see(idx)
+        self.on_listbox_select()
+
+    def start_edit(self, idx, edges, event):
+        self.edit_idx = idx
+        self.edit_edges = edges
+        self.edit_bbox = self.bboxes[idx]
+        self.edit_origin = self.canvas_to_image(event.x, event.y)
+        self.box_index.remove(idx, self.edit_bbox)
+        self.select_box(idx)
+
+    def edit_motion(self, event):
+        x, y = self.canvas_to_image(event.x, event.y)
+        top, left, bottom, right, color_id = self.edit_bbox
+        if not self.edit_edges:
+            # Move the whole box, but keep it inside the image
+            dx = max(-left, min(x - self.edit_origin[0], self.img_width - right))
+            dy = max(-top, min(y - self.edit_origin[1], self.img_height - bottom))
+            top, left, bottom, right = top + dy, left + dx, bottom + dy, right + dx
+        if "top" in self.edit_edges:
+            top = y
+        if "bottom" in self.edit_edges:
+            bottom = y
+        if "left" in self.edit_edges:
+            left = x
+        if "right" in self.edit_edges:
+            right = x
+        self.bboxes[self.edit_idx] = [top, left, bottom, right, color_id]
+        xy = self.box_to_canvas(self.bboxes[self.edit_idx])
+        self.canvas.coords(self.vis_rect_list[self.edit_idx], *xy)
+        if self.enhance_vis_rect is not None:
+            self.canvas.coords(self.enhance_vis_rect, *xy)
+
+    def end_edit(self, event):
+        idx = self.edit_idx
+        top, left, bottom, right, color_id = self.bboxes[idx]
+        top, bottom = sorted((top, bottom))
+        left, right = sorted((left, right))
+        if (right - left) > cfg.min_box_size and (bottom - top) > cfg.min_box_size:
+            bbox = [top, left, bottom, right, color_id]
+            self.record_edit(OP_SET, idx, self.edit_bbox, bbox)
+        else:
+            # Too small, restore the box as it was before the edit
+            bbox = self.edit_bbox
+        self.bboxes[idx] = bbox
+        self.box_index.insert(idx, bbox)
+        self.canvas.coords(self.vis_rect_list[idx], *self.box_to_canvas(bbox))
+
+        self.listbox.delete(idx)
+        self.listbox.insert(idx, "(%d, %d) -> (%d, %d)" % tuple(bbox[:4]))
+        self.listbox.itemconfig(idx, fg=cfg.box_colors[color_id])
+        self.select_box(idx)
+        self.edit_idx = None
+
+    def jump_to(self, idx):
+        """Save the boxes of the current image and show image `idx`."""
+        if not self.folder_loaded or not 0 <= idx < self.num_imgs:
+            return
+        if not self.in_batch(idx):
+            return
+        with self.tracer.span("navigate"):
+            # Boxes follow the objects to the next frame of a sequence
+            carried = None
+            if self.sequence_mode and idx == self.img_idx + 1:
+                carried = self.bboxes
+            self.save_bboxes_if_dirty()
+            self.img_idx = idx
+            self.show_image()
+            if carried is not None and cfg.sequence_carry_boxes:
+                self.carry_boxes(carried)
+        self.update_status()
+        if self.filmstrip is not None:
+            self.filmstrip.show_current()
+
+    def load_previous_image(self, event=None):
+        if not self.folder_loaded:
+            return
+        idx = self.find_image(-1)
+        if idx is not None:
+            self.jump_to(idx)
+        else:
+            messagebox.showinfo(title="Info", message="This is the first image!")
+
+    def load_next_image(self, event=None):
+        if not self.folder_loaded:
+            return
+        idx = self.find_image(1)
+        if idx is not None:
+            self.jump_to(idx)
+        elif self.leases is not None and self.leases.batch is not None:
+            if messagebox.askyesno(
+                title="Batch finished",
+                message="This is the last image of your batch. Mark the batch "
+                "as done and claim another one?",
+            ):
+                self.save_bboxes_if_dirty()
+                self.leases.finish()
+                self.claim_batch()
+        else:
+            messagebox.showinfo(title="Info", message="This is the last image!")
+
+    def load_next_unannotated_image(self, event=None):
+        if not self.folder_loaded:
+            return
+        if self.status_index is None or not self.status_index.keys:
+            messagebox.showinfo(
+                title="Info", message="Annotations are still being indexed."
+            )
+            return
+        # The current image counts as annotated once it has boxes
+        if self.bboxes_dirty:
+            self.save_bboxes_to_file()
+        idx = self.find_image(1, "unannotated")
+        if idx is not None:
+            self.jump_to(idx)
+        else:
+            messagebox.showinfo(title="Info", message="All images are annotated!")
+
+    def toggle_sequence_mode(self, event=None):
+        self.sequence_mode = not self.sequence_mode
+        if self.sequence_mode:
+            self.sequence_reader = SequenceReader(self.prefetcher, cfg.sequence_buffer)
+        else:
+            self.sequence_reader.stop()
+            self.sequence_reader = None
+        self.update_status()
+
+    def carry_boxes(self, bboxes):
+        """Copy the boxes of the previous frame to the current one, if it
+        is not annotated yet."""
+        if len(bboxes) < 1 or self.is_read_only():
+            return
+        if self.is_annotated(self.get_img_key()):
+            return
+        for bbox in bboxes:
+            self.bboxes.append(bbox)
+            self.record_edit(OP_ADD, len(self.bboxes) - 1, new=bbox)
+        self.refresh_boxes()
+
+    def open_keyframes(self):
+        """Keyframes of the folder, read the first time they are used."""
+        if self.keyframes is None:
+            from easybox.sequence import Keyframes
+
+            self.keyframes = Keyframes(
+                os.path.join(self.boxes_folder, "keyframes.json")
+            )
+        return self.keyframes
+
+    def toggle_keyframe(self, event=None):
+        if not self.folder_loaded or self.is_read_only():
+            return
+        self.open_keyframes().toggle(self.get_img_key())
+        self.update_status()
+
+    def interpolate_keyframes(self, event=None):
+        """Set the boxes of the frames between keyframes by linear
+        interpolation of the boxes of the keyframes, and save them."""
+        if not self.folder_loaded or self.is_read_only():
+            return
+        from easybox.sequence import interpolate
+
+        if self.bboxes_dirty:
+            self.save_bboxes_to_file()
+        keys = self.img_keys
+        keyframe_keys = self.open_keyframes()
+        # Including the keyframes set by other annotators meanwhile
+        keyframe_keys.load()
+        keyframes = [
+            (idx, self.read_boxes(key))
+            for idx, key in enumerate(keys)
+            if key in keyframe_keys
+        ]
+        if len(keyframes) < 2:
+            messagebox.showinfo(
+                title="Info", message="Set at least two keyframes with M first."
+            )
+            return
+        frames, skipped = interpolate(keyframes)
+        # Frames of the batches of other annotators are left to them
+        frames = [(idx, bboxes) for idx, bboxes in frames if self.in_batch(idx)]
+
+        # All frames go to the writer at once, to be written in bulk
+        self.writer.save_many((keys[idx], bboxes) for idx, bboxes in frames)
+        now = time.time()
+        for idx, bboxes in frames:
+            if self.status_index is not None:
+                self.status_index.set(keys[idx], len(bboxes), now)
+            if self.filmstrip is not None:
+                self.filmstrip.set_annotated(self.img_paths[idx], True)
+        if any(idx == self.img_idx for idx, _ in frames):
+            self.reload_boxes()
+
+        message = "Interpolated the boxes of {} frames.".format(len(frames))
+        if skipped:
+            message += (
+                "\nSkipped {} pairs of keyframes with different numbers of "
+                "boxes, e.g. frames {} and {}.".format(
+                    len(skipped), skipped[0][0] + 1, skipped[0][1] + 1
+                )
+            )
+        messagebox.showinfo(title="Info", message=message)
+
+    def open_video(self, event=None):
+        from easybox.sequence import VIDEO_EXTS
+
+        video_path = askopenfilename(
+            filetypes=[("Videos", " ".join("*" + ext for ext in VIDEO_EXTS))]
+        )
+        if not video_path:
+            return
+        self.load_folder(video_path)
+        if not self.sequence_mode:
+            self.toggle_sequence_mode()
+
+    def toggle_filmstrip(self, event=None):
+        if self.filmstrip is not None:
+            self.filmstrip.close()
+            return
+        if not self.folder_loaded:
+            return
+        # Only imported when the filmstrip is first opened
+        from easybox.filmstrip import Filmstrip
+
+        self.filmstrip = Filmstrip(
+            self,
+            cfg.filmstrip_thumb_size,
+            cfg.filmstrip_columns,
+            cfg.filmstrip_workers,
+            cfg.filmstrip_cache_items,
+        )
+
+    def is_annotated(self, key):
+        """Whether image `key` has saved boxes or boxes being saved. Can be
+        called from any thread."""
+        writer = self.writer
+        if writer is None:
+            return False
+        return writer.pending(key) is not None or writer.store.load(key) is not None
+
+    def left_mouse_click(self, event=None):
+        if not self.folder_loaded or self.is_read_only():
+            return
+        # Grab the edges of a box to resize it, or a box with Shift to move it
+        idx, edges = self.find_box(event.x, event.y)
+        if idx is not None and (edges or event.state & SHIFT_MASK):
+            self.start_edit(idx, edges, event)
+            return
+        self.box_top = event.y
+        self.box_left = event.x
+
+        # Create the preview items once per drag, motion events only move them
+        self.drag_canvas_size = (self.canvas.winfo_width(), self.canvas.winfo_height())
+        self.delete_rubber_band()
+        self.hor_line = self.canvas.create_line(
+            0, 0, 0, 0, width=self.cfg.box_width, state=HIDDEN
+        )
+        self.ver_line = self.canvas.create_line(
+            0, 0, 0, 0, width=self.cfg.box_width, state=HIDDEN
+        )
+        self.vis_move_rect = self.canvas.create_rectangle(
+            0,
+            0,
+            0,
+            0,
+            width=self.cfg.box_width,
+            outline=self.cfg.box_colors[self.color_id],
+            state=HIDDEN,
+        )
+
+    def left_mouse_motion(self, event=None):
+        if not self.folder_loaded or self.is_read_only():
+            return
+        if self.edit_idx is not None:
+            self.edit_motion(event)
+            return
+        # Only the last position matters: when events come faster than they
+        # are drawn, intermediate ones are dropped
+        self.motion_pos = (event.x, event.y)
+        if self.motion_job is None:
+            self.motion_job = self.after_idle(self.update_rubber_band)
+
+    def update_rubber_band(self):
+        self.motion_job = None
+        if self.vis_move_rect is None:
+            return
+        canvas_w, canvas_h = self.drag_canvas_size
+        box_top = max(0, min(self.box_top, canvas_h))
+        box_left = max(0, min(self.box_left, canvas_w))
+        box_bottom = max(0, min(self.motion_pos[1], canvas_h))
+        box_right = max(0, min(self.motion_pos[0], canvas_w))
+
+        coords = self.canvas.coords
+        coords(self.hor_line, 0, box_bottom, canvas_w, box_bottom)
+        coords(self.ver_line, box_right, 0, box_right, canvas_h)
+        coords(self.vis_move_rect, box_left, box_top, box_right, box_bottom)
+        if not self.rubber_band_shown:
+            for item in (self.hor_line, self.ver_line, self.vis_move_rect):
+                self.canvas.itemconfig(item, state=NORMAL)
+            self.rubber_band_shown = True
+
+    def delete_rubber_band(self):
+        if self.motion_job is not None:
+            self.after_cancel(self.motion_job)
+            self.motion_job = None
+        for item in (self.hor_line, self.ver_line, self.vis_move_rect):
+            if item is not None:
+                self.canvas.delete(item)
+        self.hor_line = self.ver_line = self.vis_move_rect = None
+        self.rubber_band_shown = False
+
+    def left_mouse_release(self, event=None):
+        if not self.folder_loaded or self.is_read_only():
+            return
+        if self.edit_idx is not None:
+            self.end_edit(event)
+            return
+        self.box_bottom = event.y
+        self.box_right = event.x
+        self.delete_rubber_band()
+        canvas_w, canvas_h = self.drag_canvas_size
+        box_top = max(0, min(self.box_top, canvas_h))
+        box_left = max(0, min(self.box_left, canvas_w))
+        box_bottom = max(0, min(event.y, canvas_h))
+        box_right = max(0, min(event.x, canvas_w))
+        self.vis_rect = self.canvas.create_rectangle(
+            box_left,
+            box_top,
+            box_right,
+            box_bottom,
+            width=self.cfg.box_width,
+            outline=self.cfg.box_colors[self.color_id],
+        )
+        self.vis_rect_list.append(self.vis_rect)
+        real_left, real_top = self.canvas_to_image(
+            min(box_left, box_right), min(box_top, box_bottom)
+        )
+        real_right, real_bottom = self.canvas_to_image(
+            max(box_left, box_right), max(box_top, box_bottom)
+        )
+
+        # Ignore box that is too small
+        if (real_right - real_left) > self.cfg.min_box_size and (
+            real_bottom - real_top
+        ) > self.cfg.min_box_size:
+            self.bboxes.append(
+                [real_top, real_left, real_bottom, real_right, self.color_id]
+            )
+            self.box_index.insert(len(self.bboxes) - 1, self.bboxes[-1])
+            self.record_edit(OP_ADD, len(self.bboxes) - 1, new=self.bboxes[-1])
+            self.listbox.insert(
+                END,
+                "(%d, %d) -> (%d, %d)" % (real_top, real_left, real_bottom, real_right),
+            )
+            self.listbox.itemconfig(
+                len(self.bboxes) - 1, fg=self.cfg.box_colors[self.color_id]
+            )
+            self.color_id = (self.color_id + 1) % len(self.cfg.box_colors)
+        else:
+            self.canvas.delete(self.vis_rect)
+            self.vis_rect_list.pop()
+
+    def delete_box(self, event=None):
+        if not self.folder_loaded or self.is_read_only():
+            return
+        if len(self.vis_rect_list) > 0:
+            self.canvas.delete(self.vis_move_rect)
+            self.canvas.delete(self.vis_rect_list[-1])
+            self.vis_rect_list.pop()
+            bbox = self.bboxes.pop()
+            self.box_index.remove(len(self.bboxes), bbox)
+            self.record_edit(OP_DELETE, len(self.bboxes), old=bbox)
+            self.listbox.delete(len(self.bboxes))
+            if self.enhance_vis_rect is not None:
+                self.canvas.delete(self.enhance_vis_rect)
+
+    def delete_box_and_bbox(self, event=None):
+        if not self.folder_loaded or self.is_read_only():
+            return
+        if len(self.vis_rect_list) > 0:
+            self.canvas.delete(self.vis_move_rect)
+            selected = self.listbox.curselection()
+            # Current we only support select one box each time
+            if len(selected) != 1:
+                return
+            selected_idx = int(selected[0])
+            self.canvas.delete(self.vis_rect_list[selected_idx])
+            self.canvas.delete(self.enhance_vis_rect)
+            self.vis_rect_list.pop(selected_idx)
+            bbox = self.bboxes.pop(selected_idx)
+            self.rebuild_box_index()
+            self.record_edit(OP_DELETE, selected_idx, old=bbox)
+            self.listbox.delete(selected_idx)
+
+    def resize_canvas(self, event=None):
+        w, h = event.width * 2 // 3, event.height * 2 // 3
+        self.canvas.config(width=w, height=h)
+        if self.img_item is None:
+            return
+        if self.zoom_mode:
+            self.schedule_render_tiles()
+            return
+
+        # Dragging the window edge fires bursts of Configure events. Draw a
+        # cheap preview once the burst is handled and a high quality image
+        # once the size stopped changing.
+        if self.resize_preview_job is None:
+            self.resize_preview_job = self.after_idle(self.render_resize_preview)
+        if self.resize_final_job is not None:
+            self.after_cancel(self.resize_final_job)
+        self.resize_final_job = self.after(
+            self.cfg.resize_settle_ms, self.render_resize_final
+        )
+
+    def render_resize_preview(self):
+        self.resize_preview_job = None
+        if self.zoom_mode:
+            return
+        canvas_size = (self.canvas.winfo_width(), self.canvas.winfo_height())
+        if canvas_size == self.img_resized.size:
+            return
+        with self.tracer.span("resize_preview"):
+            img_resized = self.img_resized.resize(canvas_size, PIL_Image.NEAREST)
+        self.show_resized_image(img_resized)
+        self.redraw_boxes()
+
+    def refine_image(self, img_path):
+        self.refine_job = None
+        # Another image may be shown since, or a resize is pending and will
+        # render in high quality anyway
+        if not self.folder_loaded or self.img_paths[self.img_idx] != img_path:
+            return
+        if self.resize_final_job is None:
+            self.render_resize_final()
+
+    def render_resize_final(self):
+        self.resize_final_job = None
+        if self.zoom_mode:
+            return
+        canvas_size = (self.canvas.winfo_width(), self.canvas.winfo_height())
+        img_size = (self.img_width, self.img_height)
+        with self.tracer.span("resize_final"):
+            if covers(self.img_source, canvas_size, img_size, self.cfg.source_max_size):
+                img_resized = self.img_source.resize(canvas_size, self.resample_final)
+            else:
+                # The image was decoded at a reduced scale for a smaller canvas
+                img_resized, _, self.img_source = decode_image(
+                    self.img_paths[self.img_idx],
+                    canvas_size,
+                    self.cfg.source_max_size,
+                    self.tracer,
+                    self.prefetcher.proxies,
+                    self.prefetcher.source,
+                    self.resample_final,
+                )
+        self.show_resized_image(img_resized)
+        self.redraw_boxes()
+        self.img_cache.put(
+            (self.img_paths[self.img_idx], canvas_size),
+            (img_resized, img_size, self.img_source),
+        )
+        self.schedule_decode(canvas_size)
+        self.update_status()
+
+    def redraw_boxes(self):
+        with self.tracer.span("redraw_boxes"):
+            coords = self.bboxes.to_canvas(
+                self.img_width_ratio,
+                self.img_height_ratio,
+                self.img_x_offset,
+                self.img_y_offset,
+            )
+            for vis_rect, xy in zip(self.vis_rect_list, coords):
+                self.canvas.coords(vis_rect, *xy)
+            if self.proposal_rects:
+                coords = self.proposal_boxes.to_canvas(
+                    self.img_width_ratio,
+                    self.img_height_ratio,
+                    self.img_x_offset,
+                    self.img_y_offset,
+                )
+                for rect, xy in zip(self.proposal_rects, coords):
+                    self.canvas.coords(rect, *xy)
+            if self.enhance_vis_rect is not None:
+                self.canvas.delete(self.enhance_vis_rect)
+                self.enhance_vis_rect = None
+
+    def on_listbox_select(self, event=None):
+        if not self.folder_loaded:
+            return
+        if len(self.vis_rect_list) > 0:
+            selected = self.listbox.curselection()
+            if len(selected) != 1:
+                return
+            selected_idx = int(selected[0])
+            color_id = self.bboxes[selected_idx][4]
+            self.canvas.delete(self.enhance_vis_rect)
+            self.enhance_vis_rect = self.canvas.create_rectangle(
+                *self.box_to_canvas(self.bboxes[selected_idx]),
+                width=self.cfg.enhance_box_width,
+                outline=self.cfg.box_colors[color_id],
+            )
+
+    def exit_program(self, event=None):
+        if self.folder_loaded:
+            self.save_bboxes_if_dirty()
+        self.prefetcher.shutdown()
+        if self.writer is not None:
+            self.close_writer()
+        if self.cfg.trace_path:
+            self.tracer.export_chrome(self.cfg.trace_path)
+        sys.exit(0)
+
+    def close_writer(self):
+        # Wait for all the annotations to be written
+        self.writer.flush()
+        if self.journal is not None:
+            self.journal.compact(self.writer.store)
+            self.journal.close()
+            self.journal = None
+        self.writer.close()
+        if self.status_index is not None:
+            self.status_index.save_cache()
+            self.status_index = None
+        if self.proposals is not None:
+            self.proposals.shutdown()
+            self.proposals = None
+        if self.leases is not None:
+            self.leases.release()
+            self.leases = None
+        if self.writer.failed:
+            messagebox.showerror(
+                title="Error",
+                message="Failed to save {} annotations:\n{}".format(
+                    len(self.writer.failed), "\n".join(self.writer.failed)
+                ),
+            )
+
+    def close_toplevel(self, event=None):
+        self.toplevel.destroy()
+
+    def open_about_window(self, event=None):
+        about_window = Toplevel(self)
+        about_text = Text(about_window)
+        about_text.tag_configure("center", justify="center")
+        about_content = """
+        A simple but powerful bounding box annotation tool by Python.
+
+        Homepage: https://github.com/vra/easybox
+        Author: Yunfeng Wang (wyf.brz@gmail.com)
+        """
+
+        about_text.insert(INSERT, about_content)
+        about_text.tag_add("center", "1.0", "end")
+        about_text.config(state=DISABLED)
+        about_text.pack()
+
+        self.toplevel = about_window
+
+    def open_help_window(self, event=None):
+        help_window = Toplevel(self)
+        help_text = Text(help_window)
+        help_content = """
+        1. Ctrl-O: Open a folder with images, File->Open archive... for a
+           zip or tar archive of images
+        2. Ctrl-Q: Exit this tool
+        3. Ctrl-H: Show help information
+        4. Ctrl-A: Show about information """
+
+        help_text.insert(INSERT, help_content)
+        help_text.config(state=DISABLED)
+        help_text.pack()
+
+        self.toplevel = help_window
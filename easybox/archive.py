@@ -0,0 +1,184 @@
+import io
+import json
+import os
+import struct
+import tarfile
+import threading
+import uuid
+import zipfile
+import zlib
+
+from easybox.scanner import is_image
+
+INDEX_VERSION = 1
+
+# Extensions of the archives that can be opened instead of a folder
+ARCHIVE_EXTS = [".zip", ".tar"]
+
+# Local file header of a zip member, followed by its name and extra field
+ZIP_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+ZIP_LOCAL_MAGIC = b"PK\x03\x04"
+
+
+def is_archive(path):
+    return os.path.isfile(path) and os.path.splitext(path)[1].lower() in ARCHIVE_EXTS
+
+
+def annotation_folder(archive_path):
+    """Folder of the annotations of an archive, `easybox/<archive name>`
+    next to the archive, so that keys are the member names."""
+    return os.path.join(
+        os.path.dirname(os.path.abspath(archive_path)),
+        "easybox",
+        os.path.basename(archive_path),
+    )
+
+
+class ArchiveSource:
+    """Images stored in an uncompressed tar or a zip archive, read one
+    member at a time without extracting the archive.
+
+    The members are listed once and their offsets are stored in an index
+    file, so that opening the archive again does not read its directory
+    again until the archive changes. Images are named `<archive>/<member>`,
+    like files in a folder, and `open` reads a member with a single seek.
+
+    It has the `scan` and `stop` methods of FolderScanner, to be listed in
+    background the same way."""
+
+    def __init__(self, path, exts, index_path=None):
+        self.path = path
+        self.exts = set(ext.lower() for ext in exts)
+        self.index_path = index_path
+        self.stopped = False
+        # Member name -> (offset, compressed size, size, compression)
+        self.members = {}
+        self._file = None
+        self._zip = None
+        self._lock = threading.Lock()
+
+    def stop(self):
+        self.stopped = True
+
+    def load_index(self):
+        if self.index_path is None or not os.path.exists(self.index_path):
+            return None
+        try:
+            with open(self.index_path, "r") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        stat = os.stat(self.path)
+        if (
+            index.get("version") != INDEX_VERSION
+            or index.get("mtime") != stat.st_mtime_ns
+            or index.get("size") != stat.st_size
+            or set(index.get("exts", [])) != self.exts
+        ):
+            return None
+        return {name: tuple(member) for name, member in index["members"].items()}
+
+    def save_index(self, members):
+        if self.index_path is None:
+            return
+        stat = os.stat(self.path)
+        index = {
+            "version": INDEX_VERSION,
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "exts": sorted(self.exts),
+            "members": members,
+        }
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        # Unique, other sessions may save the same index at the same time
+        tmp_path = "{}.{}.tmp".format(self.index_path, uuid.uuid4().hex)
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def list_zip(self):
+        members = {}
+        with zipfile.ZipFile(self.path) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or not is_image(info.filename, self.exts):
+                    continue
+                members[info.filename] = (
+                    info.header_offset,
+                    info.compress_size,
+                    info.file_size,
+                    info.compress_type,
+                )
+        return members
+
+    def list_tar(self):
+        members = {}
+        try:
+            archive = tarfile.open(self.path, "r:")
+        except tarfile.ReadError:
+            raise ValueError(
+                "{} is not an uncompressed tar archive, its members can't be "
+                "read by random access".format(self.path)
+            )
+        with archive:
+            for info in archive:
+                if self.stopped:
+                    break
+                if info.isfile() and is_image(info.name, self.exts):
+                    members[info.name] = (info.offset_data, info.size, info.size, None)
+        return members
+
+    def scan(self):
+        members = self.load_index()
+        if members is None:
+            if zipfile.is_zipfile(self.path):
+                members = self.list_zip()
+            else:
+                members = self.list_tar()
+            if self.stopped:
+                return
+            self.save_index(members)
+        self.members = members
+        yield "done", sorted(os.path.join(self.path, name) for name in members)
+
+    def member_name(self, path):
+        return os.path.relpath(path, self.path).replace(os.sep, "/")
+
+    def read(self, name):
+        """Bytes of member `name`."""
+        offset, compress_size, size, compression = self.members[name]
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "rb")
+            f = self._file
+            f.seek(offset)
+            if compression is not None:
+                header = ZIP_LOCAL_HEADER.unpack(f.read(ZIP_LOCAL_HEADER.size))
+                if header[0] != ZIP_LOCAL_MAGIC:
+                    raise OSError("Bad zip member header: {}".format(name))
+                # Skip the name and extra field, whose lengths are the last
+                # two fields of the header
+                f.seek(header[-2] + header[-1], os.SEEK_CUR)
+            data = f.read(compress_size)
+            if compression not in (None, zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+                # Rare compressions, read through zipfile
+                if self._zip is None:
+                    self._zip = zipfile.ZipFile(self.path)
+                return self._zip.read(name)
+        if compression == zipfile.ZIP_DEFLATED:
+            data = zlib.decompress(data, -zlib.MAX_WBITS)
+        if len(data) != size:
+            raise OSError("Truncated archive member: {}".format(name))
+        return data
+
+    def open(self, path):
+        """File object of the image at `path`, as returned by `scan`."""
+        return io.BytesIO(self.read(self.member_name(path)))
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._zip is not None:
+                self._zip.close()
+                self._zip = None
@@ -0,0 +1,108 @@
+from array import array
+
+# Number of values of a box: top, left, bottom, right, color_id
+BOX_SIZE = 5
+
+
+class BoxArray:
+    """Boxes [top, left, bottom, right, color_id] stored as a flat N x 5
+    array of doubles.
+
+    It behaves like the list of lists used before (len, indexing, append,
+    pop, iteration), while coordinate transforms and text conversions work
+    on whole columns at once instead of box by box."""
+
+    def __init__(self, bboxes=()):
+        if isinstance(bboxes, BoxArray):
+            self.data = array("d", bboxes.data)
+        else:
+            self.data = array("d")
+            for bbox in bboxes:
+                self.append(bbox)
+
+    @classmethod
+    def from_text(cls, text):
+        """Parse the content of an annotation file, one
+        `top left bottom right color` box per line."""
+        boxes = cls()
+        boxes.data = array("d", map(float, text.split()))
+        if len(boxes.data) % BOX_SIZE != 0:
+            raise ValueError("Annotation values are not a multiple of 5")
+        return boxes
+
+    def to_text(self):
+        values = [int(v) for v in self.data]
+        return ("%d %d %d %d %d\n" * len(self)) % tuple(values)
+
+    def __len__(self):
+        return len(self.data) // BOX_SIZE
+
+    def _offset(self, idx):
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("box index out of range")
+        return idx * BOX_SIZE
+
+    def __getitem__(self, idx):
+        start = self._offset(idx)
+        top, left, bottom, right, color_id = self.data[start : start + BOX_SIZE]
+        return [top, left, bottom, right, int(color_id)]
+
+    def __setitem__(self, idx, bbox):
+        start = self._offset(idx)
+        self.data[start : start + BOX_SIZE] = array("d", bbox)
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def append(self, bbox):
+        if len(bbox) != BOX_SIZE:
+            raise ValueError("A box has 5 values")
+        self.data.extend(bbox)
+
+    def insert(self, idx, bbox):
+        if not 0 <= idx <= len(self):
+            raise IndexError("box index out of range")
+        if len(bbox) != BOX_SIZE:
+            raise ValueError("A box has 5 values")
+        start = idx * BOX_SIZE
+        self.data[start:start] = array("d", bbox)
+
+    def pop(self, idx=-1):
+        bbox = self[idx]
+        start = self._offset(idx)
+        del self.data[start : start + BOX_SIZE]
+        return bbox
+
+    def copy(self):
+        return BoxArray(self)
+
+    def column(self, idx):
+        return self.data[idx::BOX_SIZE]
+
+    def to_canvas(self, x_ratio, y_ratio, x_offset=0, y_offset=0):
+        """Canvas coordinates (x0, y0, x1, y1) of all boxes, where image
+        pixel x maps to canvas pixel (x - x_offset) / x_ratio."""
+        xs0 = [(v - x_offset) / x_ratio for v in self.column(1)]
+        ys0 = [(v - y_offset) / y_ratio for v in self.column(0)]
+        xs1 = [(v - x_offset) / x_ratio for v in self.column(3)]
+        ys1 = [(v - y_offset) / y_ratio for v in self.column(2)]
+        return list(zip(xs0, ys0, xs1, ys1))
+
+    def scale(self, x_ratio, y_ratio, x_offset=0, y_offset=0):
+        """Map boxes from canvas to image pixels, the inverse of
+        `to_canvas`, in place."""
+        for idx, ratio, offset in (
+            (0, y_ratio, y_offset),
+            (1, x_ratio, x_offset),
+            (2, y_ratio, y_offset),
+            (3, x_ratio, x_offset),
+        ):
+            self.data[idx::BOX_SIZE] = array(
+                "d", [v * ratio + offset for v in self.column(idx)]
+            )
@@ -0,0 +1,220 @@
+import argparse
+import os
+import sys
+
+from easybox.annotations import copy_annotations, open_store
+from easybox.config import cfg
+
+
+def run_export(args):
+    from easybox.export import export
+
+    def report(key, message):
+        print("{}: skipped, {}".format(key, message), file=sys.stderr, flush=True)
+
+    stats = export(
+        args.folder,
+        args.out,
+        args.format,
+        jobs=args.jobs,
+        recursive=args.recursive,
+        store=args.store,
+        report=report,
+    )
+    print(
+        "Exported {} of {} images, {} boxes in {:.2f}s ({:.1f} images/s)".format(
+            stats["images"],
+            stats["images_scanned"],
+            stats["boxes"],
+            stats["seconds"],
+            stats["images_per_second"],
+        )
+    )
+    return 1 if stats["problems"] else 0
+
+
+def run_convert(args):
+    boxes_folder = os.path.join(args.folder, "easybox")
+    src_store = open_store(boxes_folder, args.src)
+    dst_store = open_store(boxes_folder, args.dst)
+    copy_annotations(src_store, dst_store)
+    src_store.close()
+    dst_store.close()
+
+
+def run_proxy(args):
+    from easybox.proxy import build_proxies
+
+    stats = build_proxies(
+        args.folder,
+        args.size,
+        args.quality,
+        jobs=args.jobs,
+        recursive=args.recursive,
+        prune=args.prune,
+    )
+    for img_path, error in stats["errors"]:
+        print("{}: {}".format(img_path, error), file=sys.stderr)
+    print(
+        "Built {} proxies, {} up to date, {} outdated removed in {:.2f}s".format(
+            stats["built"], stats["up_to_date"], stats["removed"], stats["seconds"]
+        )
+    )
+    return 1 if stats["errors"] else 0
+
+
+def run_validate(args):
+    from easybox.validate import validate
+
+    def report(key, message):
+        print("{}: {}".format(key, message), flush=True)
+
+    stats = validate(
+        args.folder,
+        jobs=args.jobs,
+        recursive=args.recursive,
+        store=args.store,
+        report=report if args.command == "validate" else None,
+    )
+    if args.command == "stats":
+        print_stats(stats)
+    print(
+        "Checked {} boxes of {} annotated images in {:.2f}s, {} problems".format(
+            stats["boxes"], stats["images"], stats["seconds"], stats["problems"]
+        )
+    )
+    return 1 if stats["problems"] else 0
+
+
+def print_histogram(title, counter, label):
+    print(title)
+    if not counter:
+        print("  (none)")
+        return
+    total = sum(counter.values())
+    top = max(counter.values())
+    for key in sorted(counter):
+        print(
+            "  {:>12} {:>9} {:6.2f}% {}".format(
+                label(key),
+                counter[key],
+                100.0 * counter[key] / total,
+                "#" * max(1, round(40 * counter[key] / top)),
+            )
+        )
+
+
+def print_stats(stats):
+    print(
+        "{} images, {} annotated, {} boxes, {} annotations without image".format(
+            stats["images_scanned"], stats["images"], stats["boxes"], stats["orphans"]
+        )
+    )
+    print_histogram("Images per box count:", stats["images_per_box_count"], str)
+    print_histogram(
+        "Boxes per size (side of the square of the same area, in pixel):",
+        stats["boxes_per_size"],
+        lambda k: "< 1" if k < 0 else "{}-{}".format(2**k, 2 ** (k + 1) - 1),
+    )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="easybox",
+        description="Run without arguments to open the annotation window.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser(
+        "export", help="export annotations to COCO, Pascal VOC or YOLO"
+    )
+    export_parser.add_argument("folder", help="annotated image folder")
+    export_parser.add_argument(
+        "out", help="output JSON file for coco, output folder for voc and yolo"
+    )
+    export_parser.add_argument(
+        "-f", "--format", choices=["coco", "voc", "yolo"], default="coco"
+    )
+    export_parser.add_argument(
+        "-j", "--jobs", type=int, default=None, help="number of worker processes"
+    )
+    export_parser.add_argument(
+        "-r",
+        "--recursive",
+        action="store_true",
+        default=cfg.scan_recursive,
+        help="also export sub-folders",
+    )
+    export_parser.add_argument(
+        "--store", choices=["txt", "sqlite"], default=cfg.annotation_store
+    )
+    export_parser.set_defaults(func=run_export)
+
+    convert_parser = subparsers.add_parser(
+        "convert", help="copy annotations between the txt and sqlite stores"
+    )
+    convert_parser.add_argument("folder", help="annotated image folder")
+    convert_parser.add_argument("src", choices=["txt", "sqlite"])
+    convert_parser.add_argument("dst", choices=["txt", "sqlite"])
+    convert_parser.set_defaults(func=run_convert)
+
+    proxy_parser = subparsers.add_parser(
+        "proxy", help="build reduced copies of the images to open them faster"
+    )
+    proxy_parser.add_argument("folder", help="image folder")
+    proxy_parser.add_argument(
+        "--size",
+        type=int,
+        default=cfg.proxy_max_size,
+        help="maximal side of the proxies",
+    )
+    proxy_parser.add_argument(
+        "--quality", type=int, default=cfg.proxy_quality, help="JPEG quality"
+    )
+    proxy_parser.add_argument(
+        "-j", "--jobs", type=int, default=None, help="number of worker processes"
+    )
+    proxy_parser.add_argument(
+        "-r",
+        "--recursive",
+        action="store_true",
+        default=cfg.scan_recursive,
+        help="also build proxies of sub-folders",
+    )
+    proxy_parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="remove the outdated proxies and those of images not scanned",
+    )
+    proxy_parser.set_defaults(func=run_proxy)
+
+    for command, command_help in [
+        ("validate", "report broken annotations"),
+        ("stats", "print statistics of the annotations"),
+    ]:
+        validate_parser = subparsers.add_parser(command, help=command_help)
+        validate_parser.add_argument("folder", help="annotated image folder")
+        validate_parser.add_argument(
+            "-j", "--jobs", type=int, default=None, help="number of worker processes"
+        )
+        validate_parser.add_argument(
+            "-r",
+            "--recursive",
+            action="store_true",
+            default=cfg.scan_recursive,
+            help="also check sub-folders",
+        )
+        validate_parser.add_argument(
+            "--store", choices=["txt", "sqlite"], default=cfg.annotation_store
+        )
+        validate_parser.set_defaults(func=run_validate)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+class Config:
+    def __init__(self):
+        # Supported image formats
+        self.supported_img_exts = [
+            "jpg",
+            "JPG",
+            "png",
+            "PNG",
+            "jpeg",
+            "JPEG",
+            "bmp",
+            "BMP",
+            "jpe",
+            "JPE",
+        ]
+        # How annotations are stored under the `easybox` folder: "txt" for
+        # one text file per image, "sqlite" for a single database file
+        self.annotation_store = "txt"
+        # Whether to sync the edit journal to disk after each edit: slower,
+        # but edits also survive a power failure and not only a crash
+        self.journal_fsync = False
+        # Number of journal records after which saved edits are folded into
+        # the annotations and the journal is emptied
+        self.journal_compact_records = 4096
+        # Whether to decode the reduced copies of the images (proxies) built
+        # by `easybox proxy` or File->Build proxies instead of the originals
+        self.use_proxies = True
+        # Maximal side of the proxies (in pixel)
+        self.proxy_max_size = 2048
+        # JPEG quality of the proxies
+        self.proxy_quality = 90
+        # Images shown by previous/next: "all", "unannotated", "empty",
+        # "min_boxes" (more than nav_filter_value boxes) or "changed_since"
+        # (annotation changed after timestamp nav_filter_value)
+        self.nav_filter = "all"
+        self.nav_filter_value = 0
+        # Whether previous/next only show the first image of each group of
+        # consecutive near-duplicate images, e.g. frames of a video
+        self.skip_duplicates = False
+        # Side of the perceptual hash of the images (hash_size^2 bits)
+        self.duplicate_hash_size = 8
+        # Maximal number of different hash bits of near-duplicate images
+        self.duplicate_max_distance = 6
+        # Number of frames decoded ahead of the current one in sequence mode
+        self.sequence_buffer = 8
+        # Whether boxes of a frame are copied to the next frame, if it is
+        # not annotated yet, in sequence mode
+        self.sequence_carry_boxes = True
+        # Decoder of the videos, and JPEG quality of the frames (2 is best,
+        # 31 is worst)
+        self.ffmpeg = "ffmpeg"
+        self.video_frame_quality = 2
+        # Whether several annotators share the folder: each session claims
+        # a batch of images through lease files under `easybox/leases` and
+        # only navigates in it
+        self.shared_mode = False
+        # Number of images of each batch
+        self.lease_batch_size = 100
+        # Time after which the lease of a session that stopped touching it,
+        # e.g. because it crashed, can be claimed by another session (s)
+        self.lease_timeout_s = 600
+        # Interval between two touches of the lease of the session (s)
+        self.lease_renew_s = 60
+        # Whether to also look for images in sub-folders
+        self.scan_recursive = False
+        # Number of found images added to the image list at once
+        self.scan_batch_size = 1000
+        # Interval to check for images found by the folder scanner (ms)
+        self.scan_poll_ms = 50
+
+        # Default windows width
+        self.default_win_width = 1600
+        # Default windows height
+        self.default_win_height = 760
+        # Default canvas width
+        self.default_canvas_width = 400
+        # Default canvas height
+        self.default_canvas_height = 400
+
+        # Number of images before and after the current one to decode ahead
+        self.prefetch_radius = 2
+        # Number of threads used to decode images ahead
+        self.prefetch_workers = 2
+        # Maximal number of decoded images kept in memory
+        self.cache_max_items = 16
+        # Maximal memory used by decoded images (in MB)
+        self.cache_max_mb = 256
+        # Maximal side of the decoded image kept to re-render on resize
+        self.source_max_size = 2048
+        # Delay after the last resize event before a high quality render (ms)
+        self.resize_settle_ms = 200
+        # How images are resampled to the canvas: "progressive" shows a
+        # preview at once and replaces it with a high quality render when
+        # idle, "quality" only shows the high quality render and "fast" only
+        # shows the preview
+        self.resample_policy = "progressive"
+        # Filter of the preview: "nearest", "bilinear", "bicubic" or "lanczos"
+        self.resample_preview = "bilinear"
+        # Filter of the high quality render
+        self.resample_final = "lanczos"
+
+        # Size of the tiles of zoom mode (in pixel)
+        self.zoom_tile_size = 256
+        # Maximal number of pixels of the images opened in zoom mode, above
+        # the limit of Pillow against decompression bombs (None for no limit)
+        self.zoom_max_pixels = 2000000000
+        # Maximal number of tiles of zoom mode kept in memory
+        self.zoom_max_tiles = 512
+        # Zoom factor of each mouse wheel step
+        self.zoom_step = 1.25
+        # Maximal zoom, as number of canvas pixels per image pixel
+        self.zoom_max = 8
+        # Interval to check for tiles built in background (ms)
+        self.zoom_poll_ms = 100
+
+        # Maximal side of the thumbnails of the filmstrip (in pixel)
+        self.filmstrip_thumb_size = 128
+        # Number of thumbnails on each row of the filmstrip
+        self.filmstrip_columns = 4
+        # Number of threads used to decode thumbnails
+        self.filmstrip_workers = 2
+        # Maximal number of thumbnails kept in memory
+        self.filmstrip_cache_items = 512
+
+        # Detector proposing boxes ahead of the annotator, as
+        # "package.module:function", e.g. "easybox.proposals:center_detector",
+        # None to annotate without proposals
+        self.detector = None
+        # Number of worker processes running the detector
+        self.detector_jobs = 1
+        # Number of images after the current one to run the detector on
+        self.detector_ahead = 4
+        # Outline color and dash pattern of the proposed boxes
+        self.proposal_color = "white"
+        self.proposal_dash = (4, 4)
+
+        # Mimimal size of bounding box (in pixel).
+        self.min_box_size = 2
+
+        # Boundingbox width
+        self.box_width = 2
+        # Enhanced boundingbox (when selected in boundingbox list) width
+        self.enhance_box_width = 5
+        # Distance to a box edge to grab it and resize the box (in pixel)
+        self.edit_handle_size = 5
+        # Number of spatial index cells along the longest image side
+        self.index_grid_cells = 64
+
+        # Format of status bar shown at the bottom of windows
+        self.status_format = "Directory: {} | Total: {}, Current: {}"
+        # Text appended to the status bar while the folder is scanned
+        self.scan_status_suffix = " (scanning...)"
+        # Format of the annotation progress appended to the status bar
+        self.index_status_format = " | Annotated: {}/{}"
+        # Text appended to the status bar when a navigation filter is used
+        self.filter_status_format = " | Filter: {}"
+        # Format of the claimed batch in the status bar, in shared mode
+        self.batch_status_format = " | Batch {}: images {}-{}"
+        # Text appended to the status bar in shared mode, when no batch is
+        # claimed and boxes cannot be changed
+        self.read_only_status_suffix = " | Read only: no batch claimed"
+        # Format of the number of groups of duplicates in the status bar
+        self.duplicate_status_format = " | Unique: {}"
+        # Text appended to the status bar while proxies are built
+        self.proxy_status_suffix = " (building proxies...)"
+        # Text appended to the status bar while a video is decoded
+        self.video_status_suffix = " (decoding video...)"
+        # Text appended to the status bar in sequence mode, and on keyframes
+        self.sequence_status_suffix = " | Sequence"
+        self.keyframe_status_suffix = " | Keyframe"
+        # Format of image cache statistics appended to the status bar
+        self.cache_status_format = " | Cache hits: {}, misses: {}"
+        # Format of annotation saving statistics appended to the status bar
+        self.save_status_format = " | Saves written: {}, skipped: {}"
+        # Stages whose p50/p95 durations are appended to the status bar when
+        # timings are shown (Ctrl-T)
+        self.trace_status_stages = [
+            "navigate",
+            "save",
+            "image",
+            "photo",
+            "paint",
+            "boxes",
+        ]
+        # Format of the p50/p95 durations of a stage (in ms)
+        self.trace_status_format = " | {}: {:.0f}/{:.0f} ms"
+        # Number of recent durations of each stage used for p50/p95
+        self.trace_window = 200
+        # Maximal number of spans kept for the trace export
+        self.trace_max_events = 100000
+        # Chrome trace JSON file written on exit, None to disable
+        self.trace_path = None
+
+        # All different colors that used in easybox. I get this list from
+        # http://www.science.smith.edu/dftwiki/index.php/Color_Charts_for_TKinter
+        self.box_colors = [
+            "red",
+            "green",
+            "yellow",
+            "hot pink",
+            "DarkOrange3",
+            "cornflower blue",
+            "lime green",
+            "maroon1",
+            "light slate blue",
+            "DarkSeaGreen3",
+            "turquoise",
+            "VioletRed2",
+            "MediumOrchid1",
+            "purple",
+            "black",
+            "brown",
+            "forest green",
+            "LemonChiffon3",
+            "dark salmon",
+            "LightBlue2",
+            "blue4",
+            "alice blue",
+            "orchid3",
+            "SeaGreen1",
+            "AntiqueWhite2",
+            "thistle1",
+            "light slate gray",
+            "firebrick3",
+            "midnight blue",
+            "goldenrod4",
+            "PeachPuff2",
+            "DodgerBlue4",
+            "LavenderBlush4",
+            "LemonChiffon4",
+            "LightSkyBlue2",
+            "LightCyan4",
+            "dark violet",
+            "RosyBrown1",
+            "firebrick4",
+            "medium aquamarine",
+            "salmon2",
+            "SkyBlue2",
+            "AntiqueWhite3",
+            "DarkOrange1",
+            "DarkOrange2",
+            "sienna1",
+            "SkyBlue3",
+            "LightYellow2",
+            "powder blue",
+            "HotPink3",
+            "NavajoWhite2",
+            "SlateBlue2",
+            "red2",
+            "DarkOliveGreen2",
+            "light goldenrod yellow",
+            "aquamarine4",
+            "bisque4",
+            "lavender",
+            "orange2",
+            "sandy brown",
+            "linen",
+            "orchid2",
+            "gold3",
+            "LightGoldenrod4",
+            "SlateBlue3",
+            "pale goldenrod",
+            "DarkGoldenrod3",
+        ]
+
+
+cfg = Config()
@@ -0,0 +1,158 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+import uuid
+
+from PIL import Image as PIL_Image
+
+from easybox.parallel import chunked, imap_bounded
+
+# Hash of an image that could not be read, never a duplicate
+NO_HASH = -1
+
+
+def dhash(img_path, hash_size=8):
+    """Difference hash of an image: bit i is set when pixel i of a
+    grayscale thumbnail of (hash_size + 1) x hash_size pixels is brighter
+    than its right neighbor. Near-duplicate images have hashes that differ
+    by a few bits."""
+    with PIL_Image.open(img_path) as img:
+        # Only decode what the tiny thumbnail needs (JPEG only)
+        img.draft("L", (hash_size * 8, hash_size * 8))
+        pixels = (
+            img.convert("L")
+            .resize((hash_size + 1, hash_size), PIL_Image.BILINEAR)
+            .tobytes()
+        )
+    value = 0
+    for row in range(hash_size):
+        start = row * (hash_size + 1)
+        for col in range(start, start + hash_size):
+            value = value << 1 | (pixels[col] > pixels[col + 1])
+    return value
+
+
+def distance(hash1, hash2):
+    """Number of different bits of two hashes."""
+    return bin(hash1 ^ hash2).count("1")
+
+
+def hash_chunk(hash_size, chunk):
+    """Hashes of the images of `chunk`, NO_HASH for broken images."""
+    hashes = []
+    for img_path in chunk:
+        try:
+            hashes.append(dhash(img_path, hash_size))
+        # Pillow raises various errors on broken or too large images
+        except Exception:
+            hashes.append(NO_HASH)
+    return hashes
+
+
+class DuplicateIndex:
+    """Perceptual hashes of the images of a folder, and groups of
+    consecutive near-duplicate images, such as the frames of a video or
+    a burst.
+
+    Hashes are cached in `cache_path` with the mtime and size of each
+    image, so that only new or changed images are hashed again. Each group
+    is represented by its first image."""
+
+    def __init__(self, cache_path=None, hash_size=8, max_distance=6):
+        self.cache_path = cache_path
+        self.hash_size = hash_size
+        self.max_distance = max_distance
+        self.hashes = []
+        # Position of the representative of the group of each image
+        self.groups = array("i")
+
+    def load_cache(self):
+        if self.cache_path is None or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, "r") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if cache.get("hash_size") != self.hash_size:
+            return {}
+        return cache["hashes"]
+
+    def save_cache(self, hashes):
+        if self.cache_path is None:
+            return
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = "{}.{}.tmp".format(self.cache_path, uuid.uuid4().hex)
+        with open(tmp_path, "w") as f:
+            json.dump({"hash_size": self.hash_size, "hashes": hashes}, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def build(self, img_paths, keys, jobs=None, chunk_size=64, mp_context=None):
+        """Hash the images `img_paths`, named `keys` in the cache, on all
+        cores and group them. See ProxyCache.build for `mp_context`."""
+        cached = self.load_cache()
+        entries = {}
+        missing = []
+        for img_path, key in zip(img_paths, keys):
+            try:
+                stat = os.stat(img_path)
+            except OSError:
+                continue
+            signature = [stat.st_mtime_ns, stat.st_size]
+            entry = cached.get(key)
+            if entry is not None and entry[:2] == signature:
+                entries[key] = entry
+            else:
+                entries[key] = signature + [NO_HASH]
+                missing.append((img_path, key))
+
+        if missing:
+            jobs = jobs or os.cpu_count() or 1
+            with ProcessPoolExecutor(jobs, mp_context) as executor:
+                chunks = list(chunked(missing, chunk_size))
+                for chunk, hashes in zip(
+                    chunks,
+                    imap_bounded(
+                        executor,
+                        hash_chunk,
+                        ([img_path for img_path, _ in chunk] for chunk in chunks),
+                        jobs * 4,
+                        self.hash_size,
+                    ),
+                ):
+                    for (_, key), value in zip(chunk, hashes):
+                        entries[key][2] = value
+            self.save_cache(entries)
+
+        self.hashes = [entries.get(key, (0, 0, NO_HASH))[2] for key in keys]
+        self.group()
+
+    def group(self):
+        """Put each image in the group of the previous image when it is at
+        most `max_distance` bits away from the first image of this group."""
+        groups = array("i", range(len(self.hashes)))
+        hashes = self.hashes
+        for idx in range(1, len(hashes)):
+            first = groups[idx - 1]
+            if (
+                hashes[idx] != NO_HASH
+                and hashes[first] != NO_HASH
+                and distance(hashes[idx], hashes[first]) <= self.max_distance
+            ):
+                groups[idx] = first
+        self.groups = groups
+
+    def is_representative(self, idx):
+        return self.groups[idx] == idx
+
+    def members(self, idx):
+        """Positions of all the images of the group of image `idx`."""
+        first = self.groups[idx]
+        last = first + 1
+        while last < len(self.groups) and self.groups[last] == first:
+            last += 1
+        return range(first, last)
+
+    def num_groups(self):
+        return sum(1 for idx, first in enumerate(self.groups) if idx == first)
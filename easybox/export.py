@@ -0,0 +1,286 @@
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from xml.sax.saxutils import escape
+
+from PIL import Image as PIL_Image
+
+from easybox.annotations import open_store
+from easybox.config import cfg
+from easybox.loader import open_large_image
+from easybox.parallel import chunked, imap_bounded
+from easybox.scanner import FolderScanner
+
+EXPORT_FORMATS = ["coco", "voc", "yolo"]
+
+# easybox has no class labels, every box belongs to this category
+CATEGORY_NAME = "object"
+
+
+def read_image_info(img_path):
+    """Read width, height and number of channels from the image header,
+    without decoding the pixels, so that images of any size can be read."""
+    with open_large_image(img_path) as img:
+        return img.width, img.height, len(img.getbands())
+
+
+def format_voc(key, img_info, bboxes):
+    width, height, depth = img_info
+    lines = [
+        "<annotation>",
+        "  <folder>{}</folder>".format(escape(os.path.dirname(key))),
+        "  <filename>{}</filename>".format(escape(os.path.basename(key))),
+        "  <size>",
+        "    <width>{}</width>".format(width),
+        "    <height>{}</height>".format(height),
+        "    <depth>{}</depth>".format(depth),
+        "  </size>",
+    ]
+    for top, left, bottom, right, _ in bboxes:
+        lines += [
+            "  <object>",
+            "    <name>{}</name>".format(CATEGORY_NAME),
+            "    <difficult>0</difficult>",
+            "    <bndbox>",
+            "      <xmin>{}</xmin>".format(int(left)),
+            "      <ymin>{}</ymin>".format(int(top)),
+            "      <xmax>{}</xmax>".format(int(right)),
+            "      <ymax>{}</ymax>".format(int(bottom)),
+            "    </bndbox>",
+            "  </object>",
+        ]
+    lines.append("</annotation>")
+    return "\n".join(lines) + "\n"
+
+
+def format_yolo(img_info, bboxes):
+    width, height, _ = img_info
+    return "".join(
+        "0 %.6f %.6f %.6f %.6f\n"
+        % (
+            (left + right) / 2 / width,
+            (top + bottom) / 2 / height,
+            (right - left) / width,
+            (bottom - top) / height,
+        )
+        for top, left, bottom, right, _ in bboxes
+    )
+
+
+def temp_path(path):
+    """Unique temporary file next to `path`, renamed to `path` once it is
+    complete so that a failed export never leaves a truncated file."""
+    return "{}.{}.tmp".format(path, uuid.uuid4().hex)
+
+
+def write_text(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = temp_path(path)
+    try:
+        with open(tmp_path, "w") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+_stores = {}
+
+
+def export_chunk(job, chunk):
+    """Read boxes and image sizes of (img_path, key) pairs in `chunk`.
+
+    VOC and YOLO files are written here, in the worker process. For COCO,
+    the (key, img_info, bboxes) records are returned to be streamed into a
+    single JSON file by the parent process, other formats only return the
+    number of boxes as a list of placeholders.
+
+    Images whose annotation or header cannot be read are skipped, and
+    returned as (key, message) pairs with the records."""
+    store_key = (job["boxes_folder"], job["store"])
+    if store_key not in _stores:
+        _stores[store_key] = open_store(*store_key)
+    store = _stores[store_key]
+
+    records = []
+    problems = []
+    for img_path, key in chunk:
+        try:
+            bboxes = store.load(key)
+        except ValueError as e:
+            problems.append((key, "unreadable annotation: {}".format(e)))
+            continue
+        if bboxes is None:
+            # Not annotated yet
+            continue
+        try:
+            img_info = read_image_info(img_path)
+        except (OSError, PIL_Image.DecompressionBombError) as e:
+            problems.append((key, "unreadable image: {}".format(e)))
+            continue
+        stem = os.path.splitext(key)[0]
+        if job["format"] == "voc":
+            write_text(
+                os.path.join(job["out"], stem + ".xml"),
+                format_voc(key, img_info, bboxes),
+            )
+        elif job["format"] == "yolo":
+            write_text(
+                os.path.join(job["out"], stem + ".txt"), format_yolo(img_info, bboxes)
+            )
+        if job["format"] != "coco":
+            bboxes = [None] * len(bboxes)
+        records.append((key, img_info, bboxes))
+    return records, problems
+
+
+class CocoWriter:
+    """Write COCO JSON without keeping the dataset in memory: images are
+    written directly, annotations are spooled to a temporary file and
+    appended at the end. The JSON file only replaces `path` when it is
+    closed, see `discard` otherwise."""
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = temp_path(path)
+        self.f = open(self.tmp_path, "w")
+        self.f.write('{"images": [')
+        self.spool = tempfile.TemporaryFile("w+")
+        self.num_imgs = 0
+        self.num_boxes = 0
+
+    def add(self, key, img_info, bboxes):
+        self.num_imgs += 1
+        img_id = self.num_imgs
+        if img_id > 1:
+            self.f.write(",")
+        json.dump(
+            {
+                "id": img_id,
+                "file_name": key,
+                "width": img_info[0],
+                "height": img_info[1],
+            },
+            self.f,
+        )
+        for bbox in bboxes:
+            top, left, bottom, right = [int(v) for v in bbox[:4]]
+            self.num_boxes += 1
+            if self.num_boxes > 1:
+                self.spool.write(",")
+            w, h = right - left, bottom - top
+            json.dump(
+                {
+                    "id": self.num_boxes,
+                    "image_id": img_id,
+                    "category_id": 1,
+                    "bbox": [left, top, w, h],
+                    "area": w * h,
+                    "iscrowd": 0,
+                },
+                self.spool,
+            )
+
+    def close(self):
+        self.f.write('], "annotations": [')
+        self.spool.seek(0)
+        shutil.copyfileobj(self.spool, self.f)
+        self.spool.close()
+        self.f.write('], "categories": ')
+        json.dump([{"id": 1, "name": CATEGORY_NAME}], self.f)
+        self.f.write("}\n")
+        self.f.close()
+        os.replace(self.tmp_path, self.path)
+
+    def discard(self):
+        """Remove the incomplete JSON file after a failure."""
+        self.spool.close()
+        self.f.close()
+        os.remove(self.tmp_path)
+
+
+def export(
+    img_folder,
+    out,
+    fmt,
+    jobs=None,
+    recursive=False,
+    store="txt",
+    exts=None,
+    chunk_size=256,
+    report=None,
+):
+    """Export annotations of `img_folder` to `out`, a JSON file for "coco"
+    or a folder for "voc" and "yolo". Images are found the same way as
+    in the window, see `Config.supported_img_exts`.
+
+    Images whose annotation or header cannot be read are skipped, and
+    `report(key, message)` is called for each of them. Returns a dict of
+    statistics."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError("Unknown export format: {}".format(fmt))
+    if exts is None:
+        exts = cfg.supported_img_exts
+    start = time.time()
+    boxes_folder = os.path.join(img_folder, "easybox")
+    scanner = FolderScanner(
+        img_folder,
+        exts,
+        recursive=recursive,
+        index_path=os.path.join(boxes_folder, "index.json"),
+    )
+    img_paths = []
+    for kind, paths in scanner.scan():
+        if kind == "done":
+            img_paths = paths
+    items = ((p, os.path.relpath(p, img_folder)) for p in img_paths)
+
+    job = {"boxes_folder": boxes_folder, "store": store, "format": fmt, "out": out}
+    coco = None
+    if fmt == "coco":
+        if os.path.dirname(out):
+            os.makedirs(os.path.dirname(out), exist_ok=True)
+        coco = CocoWriter(out)
+    else:
+        os.makedirs(out, exist_ok=True)
+
+    jobs = jobs or os.cpu_count() or 1
+    num_imgs = 0
+    num_boxes = 0
+    num_problems = 0
+    try:
+        with ProcessPoolExecutor(jobs) as executor:
+            for records, problems in imap_bounded(
+                executor, export_chunk, chunked(items, chunk_size), jobs * 4, job
+            ):
+                num_problems += len(problems)
+                if report is not None:
+                    for key, message in problems:
+                        report(key, message)
+                for key, img_info, bboxes in records:
+                    num_imgs += 1
+                    num_boxes += len(bboxes)
+                    if coco is not None:
+                        coco.add(key, img_info, bboxes)
+    except BaseException:
+        if coco is not None:
+            coco.discard()
+        raise
+    if coco is not None:
+        coco.close()
+
+    elapsed = time.time() - start
+    return {
+        "images_scanned": len(img_paths),
+        "images": num_imgs,
+        "boxes": num_boxes,
+        "problems": num_problems,
+        "seconds": elapsed,
+        "images_per_second": num_imgs / elapsed if elapsed > 0 else 0.0,
+    }
@@ -0,0 +1,244 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import math
+import os
+import queue
+
+from PIL import Image as PIL_Image, ImageTk
+from tkinter import Canvas, Scrollbar, Toplevel
+
+from easybox.loader import open_image
+
+# Color of the marker of annotated and not annotated images
+ANNOTATED_COLOR = "forest green"
+UNANNOTATED_COLOR = "gray60"
+# Outline color of the current image
+CURRENT_COLOR = "red"
+
+
+def make_thumbnail(path, size, proxies=None, source=None):
+    """Decode a thumbnail whose sides are at most `size`."""
+    proxy_path = proxies.lookup(path) if proxies is not None else None
+    if proxy_path is not None:
+        img = PIL_Image.open(proxy_path)
+    else:
+        img = open_image(path, source)
+    img.draft("RGB", (size, size))
+    img = img.convert("RGB")
+    img.thumbnail((size, size), PIL_Image.BILINEAR)
+    return img
+
+
+class Filmstrip(Toplevel):
+    """Window with a scrollable grid of thumbnails of all the images of the
+    folder. Clicking a thumbnail jumps to its image.
+
+    Only the visible cells exist on the canvas: scrolling moves the window
+    over the rows and reuses the same canvas items. Thumbnails are decoded
+    on worker threads and shown once ready, decoding of cells scrolled out
+    of view is cancelled."""
+
+    def __init__(self, app, thumb_size=128, columns=4, workers=2, cache_items=512):
+        super(Filmstrip, self).__init__(app)
+        self.app = app
+        self.thumb_size = thumb_size
+        self.columns = columns
+        self.cell_size = thumb_size + 24
+        self.cache_items = cache_items
+        self.title("Filmstrip")
+
+        # First visible row
+        self.top_row = 0
+        # Canvas items of the visible cells, reused when scrolling
+        self.cells = []
+        # Thumbnails as PhotoImage, and whether the image is annotated
+        self.thumbs = OrderedDict()
+        self.pending = {}
+        self.results = queue.Queue()
+        self.poll_job = None
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="easybox-filmstrip"
+        )
+
+        self.canvas = Canvas(
+            self, width=self.cell_size * columns, height=self.cell_size * 4
+        )
+        self.scrollbar = Scrollbar(self, orient="vertical", command=self.scroll)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.canvas.bind("<Configure>", self.render)
+        self.canvas.bind("<Button-1>", self.click)
+        self.canvas.bind("<MouseWheel>", self.wheel)
+        self.canvas.bind("<Button-4>", self.wheel)
+        self.canvas.bind("<Button-5>", self.wheel)
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.show_current()
+
+    def num_rows(self):
+        return math.ceil(self.app.num_imgs / self.columns)
+
+    def visible_rows(self):
+        return max(1, self.canvas.winfo_height() // self.cell_size)
+
+    def scroll_to(self, row):
+        max_row = max(0, self.num_rows() - self.visible_rows())
+        row = max(0, min(int(row), max_row))
+        if row != self.top_row:
+            self.top_row = row
+            self.render()
+
+    def scroll(self, action, value, unit=None):
+        """Command of the scroll bar."""
+        if action == "moveto":
+            self.scroll_to(float(value) * self.num_rows())
+        elif unit == "pages":
+            self.scroll_to(self.top_row + int(value) * self.visible_rows())
+        else:
+            self.scroll_to(self.top_row + int(value))
+
+    def wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self.top_row - 1)
+        else:
+            self.scroll_to(self.top_row + 1)
+
+    def click(self, event):
+        row = self.top_row + event.y // self.cell_size
+        col = event.x // self.cell_size
+        idx = row * self.columns + col
+        if col < self.columns and idx < self.app.num_imgs:
+            self.app.jump_to(idx)
+
+    def show_current(self):
+        """Scroll to the current image if it is not visible."""
+        row = self.app.img_idx // self.columns
+        if not self.top_row <= row < self.top_row + self.visible_rows():
+            self.top_row = max(0, row - self.visible_rows() // 2)
+        self.render()
+
+    def create_cell(self):
+        return {
+            "frame": self.canvas.create_rectangle(0, 0, 0, 0, width=3),
+            "image": self.canvas.create_image(0, 0, anchor="center"),
+            "marker": self.canvas.create_oval(0, 0, 0, 0, width=0),
+            "label": self.canvas.create_text(0, 0, anchor="n"),
+        }
+
+    def render(self, event=None):
+        num_imgs = self.app.num_imgs
+        first = self.top_row * self.columns
+        visible = range(
+            first, min(num_imgs, first + (self.visible_rows() + 1) * self.columns)
+        )
+        while len(self.cells) < len(visible):
+            self.cells.append(self.create_cell())
+
+        coords = self.canvas.coords
+        itemconfig = self.canvas.itemconfig
+        size, pad = self.cell_size, 3
+        for cell, idx in zip(self.cells, visible):
+            x = (idx % self.columns) * size
+            y = (idx // self.columns - self.top_row) * size
+            coords(cell["frame"], x + pad, y + pad, x + size - pad, y + size - pad)
+            itemconfig(
+                cell["frame"],
+                outline=CURRENT_COLOR if idx == self.app.img_idx else "",
+                state="normal",
+            )
+            coords(cell["image"], x + size // 2, y + (size - 16) // 2)
+            coords(cell["label"], x + size // 2, y + size - 18)
+            itemconfig(cell["label"], text=str(idx + 1), state="normal")
+            coords(cell["marker"], x + 8, y + 8, x + 18, y + 18)
+
+            thumb = self.thumbs.get(self.app.img_paths[idx])
+            if thumb is None:
+                itemconfig(cell["image"], image="", state="normal")
+                itemconfig(cell["marker"], state="hidden")
+            else:
+                photo, annotated = thumb
+                itemconfig(cell["image"], image=photo, state="normal")
+                itemconfig(
+                    cell["marker"],
+                    fill=ANNOTATED_COLOR if annotated else UNANNOTATED_COLOR,
+                    state="normal",
+                )
+        for cell in self.cells[len(visible) :]:
+            for item in cell.values():
+                itemconfig(item, state="hidden")
+
+        rows = max(1, self.num_rows())
+        self.scrollbar.set(
+            self.top_row / rows, min(1.0, (self.top_row + self.visible_rows()) / rows)
+        )
+        self.request([self.app.img_paths[idx] for idx in visible])
+
+    def request(self, paths):
+        """Decode the thumbnails of `paths` that are not cached, and cancel
+        the decoding of the others."""
+        wanted = set(paths)
+        for path, future in list(self.pending.items()):
+            if path not in wanted and future.cancel():
+                del self.pending[path]
+        for path in paths:
+            if path in self.thumbs:
+                self.thumbs.move_to_end(path)
+            elif path not in self.pending:
+                self.pending[path] = self.executor.submit(
+                    self.decode, path, os.path.relpath(path, self.app.img_folder)
+                )
+        if self.pending and self.poll_job is None:
+            self.poll_job = self.after(50, self.poll)
+
+    def decode(self, path, key):
+        img = None
+        annotated = False
+        try:
+            prefetcher = self.app.prefetcher
+            img = make_thumbnail(
+                path, self.thumb_size, prefetcher.proxies, prefetcher.source
+            )
+            annotated = self.app.is_annotated(key)
+        finally:
+            # Always answer, a failed thumbnail is shown empty
+            self.results.put((path, img, annotated))
+
+    def poll(self):
+        self.poll_job = None
+        updated = False
+        while not self.results.empty():
+            path, img, annotated = self.results.get()
+            self.pending.pop(path, None)
+            # PhotoImage must be created on the Tk thread
+            photo = ImageTk.PhotoImage(img) if img is not None else ""
+            self.thumbs[path] = (photo, annotated)
+            updated = True
+        while len(self.thumbs) > self.cache_items:
+            self.thumbs.popitem(last=False)
+        if updated:
+            self.render()
+        elif self.pending:
+            self.poll_job = self.after(50, self.poll)
+
+    def set_annotated(self, path, annotated):
+        thumb = self.thumbs.get(path)
+        if thumb is not None and thumb[1] != annotated:
+            self.thumbs[path] = (thumb[0], annotated)
+            self.render()
+
+    def reset(self):
+        """Forget all thumbnails, when another folder is opened."""
+        for future in self.pending.values():
+            future.cancel()
+        self.pending = {}
+        self.thumbs.clear()
+        self.top_row = 0
+        self.render()
+
+    def close(self):
+        if self.poll_job is not None:
+            self.after_cancel(self.poll_job)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.app.filmstrip = None
+        self.destroy()
@@ -0,0 +1,176 @@
+import os
+import sqlite3
+import struct
+import threading
+
+from easybox.boxes import BOX_SIZE, BoxArray
+
+# Edit operations of the journal
+OP_ADD = 1
+OP_DELETE = 2
+OP_SET = 3
+# The boxes of a key were written to the store, `idx` is the number of
+# journal records they include
+OP_SAVED = 4
+
+# op, key id, box index, old box, new box
+RECORD = struct.Struct("<BxxxIi%dd%dd" % (BOX_SIZE, BOX_SIZE))
+EMPTY_BOX = (0.0,) * BOX_SIZE
+
+
+def apply_edit(bboxes, op, idx, old, new):
+    """Apply an edit to `bboxes` in place."""
+    if op == OP_ADD:
+        bboxes.insert(idx, new)
+    elif op == OP_DELETE:
+        bboxes.pop(idx)
+    elif op == OP_SET:
+        bboxes[idx] = new
+    else:
+        raise ValueError("Unknown journal operation: {}".format(op))
+
+
+def invert_edit(op, idx, old, new):
+    """The edit that undoes (op, idx, old, new)."""
+    if op == OP_ADD:
+        return OP_DELETE, idx, new, None
+    if op == OP_DELETE:
+        return OP_ADD, idx, None, old
+    return OP_SET, idx, new, old
+
+
+class Journal:
+    """Append-only log of box edits, so that edits survive a crash before
+    the boxes are saved.
+
+    Each edit is a fixed-size record in `journal.bin`, image keys are
+    stored once in `journal.keys` and referenced by line number. Once the
+    boxes of an image are written to the store, a saved record marks the
+    edits before it as persisted. `compact` applies the remaining edits to
+    the store and empties the journal."""
+
+    def __init__(self, boxes_folder, fsync=False):
+        self.path = os.path.join(boxes_folder, "journal.bin")
+        self.keys_path = os.path.join(boxes_folder, "journal.keys")
+        self.fsync = fsync
+        self._lock = threading.Lock()
+
+        self._keys = []
+        if os.path.exists(self.keys_path):
+            with open(self.keys_path, "r", encoding="utf-8", newline="") as f:
+                content = f.read()
+            # A key without its line end was not completely written
+            self._keys = content[: content.rfind("\n") + 1].splitlines()
+            with open(self.keys_path, "a", encoding="utf-8", newline="\n") as f:
+                f.truncate(sum(len(key.encode("utf-8")) + 1 for key in self._keys))
+        self._key_ids = {key: idx for idx, key in enumerate(self._keys)}
+
+        self._f = open(self.path, "ab")
+        # Drop a record that was only partially written by a crash
+        self._count = self._f.tell() // RECORD.size
+        self._f.truncate(self._count * RECORD.size)
+        self._keys_f = open(self.keys_path, "a", encoding="utf-8", newline="\n")
+
+    def __len__(self):
+        return self._count
+
+    def _key_id(self, key):
+        key_id = self._key_ids.get(key)
+        if key_id is None:
+            key_id = len(self._keys)
+            self._keys.append(key)
+            self._key_ids[key] = key_id
+            self._keys_f.write(key + "\n")
+            self._keys_f.flush()
+        return key_id
+
+    def append(self, key, op, idx, old=None, new=None):
+        """Append an edit, returns its position in the journal."""
+        with self._lock:
+            self._f.write(
+                RECORD.pack(
+                    op, self._key_id(key), idx, *(old or EMPTY_BOX), *(new or EMPTY_BOX)
+                )
+            )
+            self._f.flush()
+            if self.fsync:
+                os.fsync(self._f.fileno())
+            self._count += 1
+            return self._count - 1
+
+    def mark_saved(self, key, count):
+        """Record that the boxes of `key` including its first `count`
+        journal records are in the store. Called by the writer thread."""
+        self.append(key, OP_SAVED, count)
+
+    def records(self):
+        """Iterate over (pos, key, op, idx, old, new) records."""
+        with self._lock:
+            self._f.flush()
+            count = self._count
+        with open(self.path, "rb") as f:
+            data = f.read(count * RECORD.size)
+        for pos, values in enumerate(RECORD.iter_unpack(data)):
+            op, key_id, idx = values[:3]
+            if key_id >= len(self._keys):
+                continue
+            old = list(values[3 : 3 + BOX_SIZE])
+            new = list(values[3 + BOX_SIZE :])
+            yield pos, self._keys[key_id], op, idx, old, new
+
+    def unsaved(self):
+        """Edits not yet in the store, as a dict key -> list of
+        (op, idx, old, new)."""
+        saved = {}
+        edits = {}
+        for pos, key, op, idx, old, new in self.records():
+            if op == OP_SAVED:
+                saved[key] = max(saved.get(key, 0), idx)
+            else:
+                edits.setdefault(key, []).append((pos, op, idx, old, new))
+        return {
+            key: [edit[1:] for edit in key_edits if edit[0] >= saved.get(key, 0)]
+            for key, key_edits in edits.items()
+            if key_edits[-1][0] >= saved.get(key, 0)
+        }
+
+    def compact(self, store):
+        """Apply unsaved edits to the boxes in `store` and empty the
+        journal. The writer must not have pending saves. Returns the keys
+        whose boxes were updated.
+
+        If some boxes can not be saved, the journal is kept so that their
+        edits are applied by the next compaction."""
+        updated = []
+        failed = False
+        for key, edits in self.unsaved().items():
+            bboxes = store.load(key) or BoxArray()
+            try:
+                for edit in edits:
+                    apply_edit(bboxes, *edit)
+            except (IndexError, ValueError):
+                # The stored boxes were changed outside of the journal
+                continue
+            try:
+                store.save(key, bboxes)
+            except (OSError, sqlite3.Error):
+                failed = True
+                continue
+            updated.append(key)
+
+        if failed:
+            # Keep the journal to retry later, without the edits now saved
+            for key in updated:
+                self.mark_saved(key, len(self))
+            return updated
+        with self._lock:
+            self._f.truncate(0)
+            self._count = 0
+            self._keys_f.truncate(0)
+            self._keys = []
+            self._key_ids = {}
+        return updated
+
+    def close(self):
+        self._f.close()
+        self._keys_f.close()
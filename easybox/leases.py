@@ -0,0 +1,184 @@
+import bisect
+import getpass
+import json
+import os
+import random
+import socket
+import time
+import uuid
+
+# Folder of the lease files, under the `easybox` folder
+LEASE_FOLDER = "leases"
+
+
+def session_name():
+    """Name of the annotator running this session, as user@host."""
+    try:
+        user = getpass.getuser()
+    except (KeyError, OSError):
+        user = "unknown"
+    return "{}@{}".format(user, socket.gethostname())
+
+
+def create_exclusive(path, content):
+    """Create `path` with `content` only if it does not exist yet, as a
+    single atomic step. Returns whether it was created."""
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+    with os.fdopen(fd, "w") as f:
+        f.write(content)
+    return True
+
+
+class LeaseManager:
+    """Batches of images shared by several annotators of the same folder.
+
+    Images are split once into batches of `batch_size` consecutive keys,
+    whose first keys are stored in `leases/batches.json` by the first
+    session, so that all sessions agree on the batches even when images
+    are added later. A session claims a batch by creating its lease file
+    `leases/<batch>.lease` with O_EXCL, which only one session can do, and
+    touches it while annotating. A lease not touched for `timeout` seconds
+    was left by a crashed session and can be claimed again. A finished
+    batch is marked with `leases/<batch>.done`.
+
+    The modification times of the annotations seen by this session are
+    remembered, so that a change made by another session since is detected
+    before it is overwritten."""
+
+    def __init__(self, boxes_folder, batch_size=100, timeout=600):
+        self.folder = os.path.join(boxes_folder, LEASE_FOLDER)
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.owner = "{}/{}".format(session_name(), uuid.uuid4().hex)
+        self.boundaries = []
+        self.batch = None
+        self.versions = {}
+        os.makedirs(self.folder, exist_ok=True)
+
+    def load_batches(self, keys):
+        """Read the batches, or define them from the sorted `keys` if this
+        is the first session of the folder."""
+        path = os.path.join(self.folder, "batches.json")
+        if not os.path.exists(path):
+            boundaries = keys[:: self.batch_size]
+            tmp_path = "{}.{}.tmp".format(path, uuid.uuid4().hex)
+            with open(tmp_path, "w") as f:
+                json.dump(boundaries, f)
+            try:
+                # Fails if another session defined the batches meanwhile
+                os.link(tmp_path, path)
+            except OSError:
+                pass
+            finally:
+                os.remove(tmp_path)
+        with open(path, "r") as f:
+            self.boundaries = json.load(f)
+
+    def batch_range(self, keys, batch=None):
+        """Positions [start, end) of the images of `batch` in `keys`."""
+        batch = self.batch if batch is None else batch
+        start = 0 if batch == 0 else bisect.bisect_left(keys, self.boundaries[batch])
+        if batch + 1 < len(self.boundaries):
+            return start, bisect.bisect_left(keys, self.boundaries[batch + 1])
+        return start, len(keys)
+
+    def lease_path(self, batch):
+        return os.path.join(self.folder, "{}.lease".format(batch))
+
+    def done_path(self, batch):
+        return os.path.join(self.folder, "{}.done".format(batch))
+
+    def is_expired(self, stat):
+        """Whether the lease file of `stat` was not touched for too long."""
+        return time.time() - stat.st_mtime > self.timeout
+
+    def try_claim(self, batch, names):
+        """Claim `batch`, given the `names` in the lease folder."""
+        lease_name = "{}.lease".format(batch)
+        lease_path = self.lease_path(batch)
+        if lease_name in names:
+            try:
+                stat = os.stat(lease_path)
+            except FileNotFoundError:
+                stat = None
+            if stat is not None:
+                if not self.is_expired(stat):
+                    return False
+                # Move the expired lease away: only one session can do so
+                stale_path = "{}.{}.stale".format(lease_path, uuid.uuid4().hex)
+                try:
+                    os.rename(lease_path, stale_path)
+                except OSError:
+                    return False
+                # Another session may have claimed the batch since the stat,
+                # its new lease is then put back unless yet another one was
+                # created meanwhile
+                moved = os.stat(stale_path)
+                if (moved.st_ino, moved.st_mtime_ns) != (stat.st_ino, stat.st_mtime_ns):
+                    try:
+                        os.link(stale_path, lease_path)
+                    except OSError:
+                        pass
+                    os.remove(stale_path)
+                    return False
+                os.remove(stale_path)
+        content = json.dumps({"owner": self.owner, "time": time.time()})
+        return create_exclusive(lease_path, content)
+
+    def claim(self):
+        """Claim a batch that is neither done nor leased, starting from a
+        random one so that sessions starting together do not compete for
+        the same batches. Returns the batch, None if there is none left."""
+        self.release()
+        names = set(os.listdir(self.folder))
+        num_batches = len(self.boundaries)
+        offset = random.randrange(num_batches) if num_batches else 0
+        for idx in range(num_batches):
+            batch = (offset + idx) % num_batches
+            if "{}.done".format(batch) in names:
+                continue
+            if self.try_claim(batch, names):
+                self.batch = batch
+                return batch
+        return None
+
+    def renew(self):
+        """Touch the lease of the current batch. Returns False if the lease
+        expired and was claimed by another session."""
+        if self.batch is None:
+            return True
+        lease_path = self.lease_path(self.batch)
+        try:
+            with open(lease_path, "r") as f:
+                if json.load(f).get("owner") != self.owner:
+                    return False
+            os.utime(lease_path)
+        except (OSError, ValueError):
+            return False
+        return True
+
+    def finish(self):
+        """Mark the current batch as done and release it."""
+        if self.batch is not None:
+            create_exclusive(self.done_path(self.batch), self.owner)
+        self.release()
+
+    def release(self):
+        if self.batch is not None and self.renew():
+            try:
+                os.remove(self.lease_path(self.batch))
+            except OSError:
+                pass
+        self.batch = None
+
+    def remember(self, key, version):
+        """Record the version of annotation `key` seen by this session."""
+        self.versions[key] = version
+
+    def is_stale(self, store, key):
+        """Whether annotation `key` was changed by another session since
+        this session read or wrote it."""
+        return key in self.versions and store.version(key) != self.versions[key]
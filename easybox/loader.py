@@ -0,0 +1,356 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+from PIL import Image as PIL_Image
+
+from easybox.trace import span
+
+# Resampling filters by name, as used in Config
+RESAMPLE_FILTERS = {
+    "nearest": PIL_Image.NEAREST,
+    "bilinear": PIL_Image.BILINEAR,
+    "bicubic": PIL_Image.BICUBIC,
+    "lanczos": PIL_Image.LANCZOS,
+}
+
+
+def open_image(path, source=None):
+    """Open the image at `path`, read from `source` (an ArchiveSource) if
+    it is not a file of a folder."""
+    return PIL_Image.open(path if source is None else source.open(path))
+
+
+# Guards the global limit of Pillow against decompression bombs, see
+# open_large_image
+_pixel_limit_lock = threading.Lock()
+
+
+def open_large_image(path, source=None, max_pixels=None):
+    """Open an image of up to `max_pixels` pixels, or of any size if None,
+    above the limit of Pillow against decompression bombs.
+
+    Pillow only checks its global limit when an image is opened, and has
+    no limit per call: the global limit is lifted for the time of the open
+    under a lock, so that overlapping calls always restore it, and
+    `max_pixels` is checked here."""
+    with _pixel_limit_lock:
+        limit = PIL_Image.MAX_IMAGE_PIXELS
+        PIL_Image.MAX_IMAGE_PIXELS = None
+        try:
+            img = open_image(path, source)
+        finally:
+            PIL_Image.MAX_IMAGE_PIXELS = limit
+    if max_pixels is not None and img.width * img.height > max_pixels:
+        img.close()
+        raise PIL_Image.DecompressionBombError(
+            "Image size ({} pixels) exceeds limit of {} pixels".format(
+                img.width * img.height, max_pixels
+            )
+        )
+    return img
+
+
+def decode_image(
+    path,
+    size,
+    source_max_size,
+    tracer=None,
+    proxies=None,
+    source=None,
+    resample=PIL_Image.LANCZOS,
+):
+    """Decode image at `path` and resize it to `size` (width, height) with
+    the `resample` filter.
+
+    Returns the resized image, the size of the original image and a copy of
+    the image whose sides are at most `source_max_size`, which is kept to
+    re-render the image at another size without going back to disk.
+
+    Each step is recorded as a "decode.*" span if a `tracer` is given. If
+    `proxies` has a reduced copy of the image, it is decoded instead; the
+    returned size is still the size of the original. Images of archives
+    are read from `source`."""
+    with span(tracer, "decode.open"):
+        img = open_image(path, source)
+        img_size = img.size
+        proxy_path = proxies.lookup(path) if proxies is not None else None
+        if proxy_path is not None:
+            img.close()
+            img = PIL_Image.open(proxy_path)
+        # JPEG can be decoded directly at 1/2, 1/4 or 1/8 scale, draft picks
+        # the smallest one that still covers `size` (no-op for other
+        # formats). Box coordinates only depend on `img_size`, which is the
+        # original size.
+        img.draft(img.mode, size)
+    with span(tracer, "decode.load"):
+        img.load()
+    with span(tracer, "decode.thumbnail"):
+        img.thumbnail((source_max_size, source_max_size), resample)
+    with span(tracer, "decode.resize"):
+        img_resized = img.resize(size, resample, reducing_gap=3.0)
+    return img_resized, img_size, img
+
+
+def image_nbytes(img):
+    return img.width * img.height * len(img.getbands())
+
+
+def entry_nbytes(value):
+    return image_nbytes(value[0]) + image_nbytes(value[2])
+
+
+def covers(img_source, size, img_size, source_max_size):
+    """Whether `img_source` has enough pixels to render at `size`, i.e. it
+    was not decoded at a lower scale than it could have been."""
+    scale = min(1, source_max_size / max(img_size))
+    for src, dst, full in zip(img_source.size, size, img_size):
+        if src < min(dst, int(full * scale)):
+            return False
+    return True
+
+
+class ImageCache:
+    """Thread-safe LRU cache of decoded images, bounded both by number of
+    entries and by memory used by the pixel data.
+
+    Keys are (path, size) tuples, values are what `decode_image` returns."""
+
+    def __init__(self, max_items, max_bytes):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        nbytes = entry_nbytes(value)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                self._nbytes -= entry_nbytes(self._items.pop(key))
+            self._items[key] = value
+            self._nbytes += nbytes
+            while len(self._items) > self.max_items or self._nbytes > self.max_bytes:
+                _, old_value = self._items.popitem(last=False)
+                self._nbytes -= entry_nbytes(old_value)
+
+    def drop_stale(self, size):
+        """Remove all entries that were not resized to `size`."""
+        with self._lock:
+            for key in [k for k in self._items if k[1] != size]:
+                self._nbytes -= entry_nbytes(self._items.pop(key))
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._nbytes = 0
+
+
+class Prefetcher:
+    """Decode and resize the neighbors of the current image on worker
+    threads, so that navigating to them only needs a cache lookup. They are
+    resized with the `resample` filter."""
+
+    def __init__(
+        self,
+        cache,
+        source_max_size,
+        radius=2,
+        num_workers=2,
+        tracer=None,
+        resample=PIL_Image.LANCZOS,
+    ):
+        self.cache = cache
+        self.source_max_size = source_max_size
+        self.tracer = tracer
+        self.resample = resample
+        # ProxyCache of the current folder, if any
+        self.proxies = None
+        # ArchiveSource when the images are read from an archive
+        self.source = None
+        self.radius = radius
+        self._size = None
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=num_workers, thread_name_prefix="easybox-prefetch"
+        )
+
+    def get(self, path, size, resample=None):
+        """Return what `decode_image` returns for `path`, waiting for an
+        in-flight prefetch or decoding synchronously if needed.
+
+        If a faster `resample` filter is given, an image that was not
+        prefetched is resized with it and is not cached, so that the cache
+        only holds images resized with the prefetch filter."""
+        key = (path, size)
+        value = self.cache.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None and future.cancel():
+                del self._pending[key]
+                future = None
+        if future is not None:
+            with span(self.tracer, "prefetch.wait"):
+                value = future.result()
+            if value is not None:
+                return value
+        value = decode_image(
+            path,
+            size,
+            self.source_max_size,
+            self.tracer,
+            self.proxies,
+            self.source,
+            resample or self.resample,
+        )
+        if resample is None:
+            self.cache.put(key, value)
+        return value
+
+    def schedule(self, img_paths, img_idx, size):
+        """Queue the `radius` images before and after `img_idx`, nearest
+        first and next before previous."""
+        with self._lock:
+            if size != self._size:
+                self._size = size
+                self.cache.drop_stale(size)
+            wanted = []
+            for offset in range(1, self.radius + 1):
+                for idx in (img_idx + offset, img_idx - offset):
+                    if 0 <= idx < len(img_paths):
+                        wanted.append((img_paths[idx], size))
+
+            # Cancel the queued work that is not a neighbor anymore
+            for key, future in list(self._pending.items()):
+                if key not in wanted and future.cancel():
+                    del self._pending[key]
+
+            for key in wanted:
+                if key in self._pending or key in self.cache:
+                    continue
+                self._pending[key] = self._executor.submit(self._decode, key)
+
+    def _decode(self, key):
+        try:
+            value = decode_image(
+                key[0],
+                key[1],
+                self.source_max_size,
+                self.tracer,
+                self.proxies,
+                self.source,
+                self.resample,
+            )
+        except Exception:
+            # Broken images are reported when they are actually shown
+            value = None
+        else:
+            self.cache.put(key, value)
+        with self._lock:
+            self._pending.pop(key, None)
+        return value
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class SequenceReader:
+    """Decode the frames of a sequence in order on a background thread, at
+    most `buffer_size` frames ahead of the current one, into the cache of
+    `prefetcher` and with its settings.
+
+    Frames are decoded one after the other instead of around the current
+    frame, which suits stepping through a video, and the bounded buffer
+    keeps the memory used constant."""
+
+    def __init__(self, prefetcher, buffer_size=8):
+        self.prefetcher = prefetcher
+        self.buffer_size = buffer_size
+        self._img_paths = []
+        self._img_idx = 0
+        self._next_idx = 0
+        self._size = None
+        self._stopped = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._run, name="easybox-sequence", daemon=True
+        )
+        self._thread.start()
+
+    def seek(self, img_paths, img_idx, size):
+        """Decode the frames after `img_idx`, when it is shown at `size`."""
+        with self._cond:
+            restart = (
+                img_paths is not self._img_paths
+                or size != self._size
+                or not self._img_idx <= img_idx <= self._next_idx
+            )
+            self._img_paths = img_paths
+            self._img_idx = img_idx
+            self._size = size
+            if restart:
+                self._next_idx = img_idx + 1
+            self._cond.notify_all()
+
+    def _run(self):
+        prefetcher = self.prefetcher
+        while True:
+            with self._cond:
+                while not self._stopped and (
+                    self._next_idx >= len(self._img_paths)
+                    or self._next_idx > self._img_idx + self.buffer_size
+                ):
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                key = (self._img_paths[self._next_idx], self._size)
+                self._next_idx += 1
+            if key in prefetcher.cache:
+                continue
+            try:
+                value = decode_image(
+                    key[0],
+                    key[1],
+                    prefetcher.source_max_size,
+                    prefetcher.tracer,
+                    prefetcher.proxies,
+                    prefetcher.source,
+                    prefetcher.resample,
+                )
+            except Exception:
+                # Broken frames are reported when they are actually shown
+                continue
+            prefetcher.cache.put(key, value)
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
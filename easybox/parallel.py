@@ -0,0 +1,27 @@
+from collections import deque
+
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def imap_bounded(executor, fn, iterable, window, *args):
+    """Like `executor.map(fn, iterable)`, but with at most `window` tasks
+    submitted at a time, so that memory stays bounded for huge inputs.
+
+    `args` are passed to `fn` before each item. Results are yielded in the
+    order of `iterable`."""
+    futures = deque()
+    for item in iterable:
+        if len(futures) >= window:
+            yield futures.popleft().result()
+        futures.append(executor.submit(fn, *args, item))
+    while futures:
+        yield futures.popleft().result()
@@ -0,0 +1,129 @@
+from concurrent.futures import ProcessPoolExecutor
+import importlib
+import io
+import os
+import queue
+import threading
+
+from PIL import Image as PIL_Image
+
+from easybox.annotations import read_bboxes, write_bboxes
+from easybox.boxes import BoxArray
+
+# Detectors already imported by a worker process
+_detectors = {}
+
+
+def center_detector(img):
+    """Stand-in detector proposing one box around the center of the image,
+    to try pre-annotation without a model."""
+    width, height = img.size
+    return [(width // 4, height // 4, width * 3 // 4, height * 3 // 4)]
+
+
+def load_detector(spec):
+    """Import the detector named `spec`, as "package.module:function".
+
+    A detector is any callable taking a PIL image in RGB and returning
+    boxes as (left, top, right, bottom) in pixels of this image."""
+    detector = _detectors.get(spec)
+    if detector is None:
+        module_name, _, attr = spec.partition(":")
+        detector = getattr(importlib.import_module(module_name), attr)
+        _detectors[spec] = detector
+    return detector
+
+
+def detect(spec, image, proposal_path):
+    """Run the detector on `image`, a path or the bytes of an image, and
+    write its proposals to `proposal_path`. Runs in a worker process."""
+    if isinstance(image, bytes):
+        image = io.BytesIO(image)
+    with PIL_Image.open(image) as img:
+        boxes = load_detector(spec)(img.convert("RGB"))
+    proposals = BoxArray()
+    for left, top, right, bottom in boxes:
+        proposals.append([top, left, bottom, right, 0])
+    write_bboxes(proposal_path, proposals)
+    return len(proposals)
+
+
+class ProposalRunner:
+    """Run a detector in worker processes on the images ahead of the
+    current one, and keep its proposals as `<key>.boxes` files in `folder`.
+
+    A proposal file is never computed twice: it is read back when the image
+    is shown again, and emptied once the proposals are accepted or rejected.
+    Keys of the finished images are put in `done`, to be polled."""
+
+    def __init__(self, folder, spec, jobs=1, mp_context=None):
+        self.folder = folder
+        self.spec = spec
+        self.jobs = jobs
+        self.mp_context = mp_context
+        self.done = queue.Queue()
+        self.failed = set()
+        self._pending = {}
+        # Reentrant: cancelling a future runs its callback at once
+        self._lock = threading.RLock()
+        self._executor = None
+
+    def path(self, key):
+        return os.path.join(self.folder, key + ".boxes")
+
+    def load(self, key):
+        """Proposals of `key`, None if they were not computed yet."""
+        return read_bboxes(self.path(key))
+
+    def discard(self, key):
+        """Forget the proposals of `key` once they are accepted or
+        rejected, without running the detector again."""
+        write_bboxes(self.path(key), BoxArray())
+
+    def pending(self):
+        with self._lock:
+            return bool(self._pending)
+
+    def schedule(self, items):
+        """Run the detector on the (key, image) pairs of `items` whose
+        proposals are missing, nearest first, and cancel the queued runs
+        of other images. `image` is a path, or a callable returning the
+        image bytes for images of archives."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(self.jobs, self.mp_context)
+            wanted = set(key for key, _ in items)
+            for key, future in list(self._pending.items()):
+                if key not in wanted:
+                    future.cancel()
+            for key, image in items:
+                if key in self._pending or key in self.failed:
+                    continue
+                if os.path.exists(self.path(key)):
+                    continue
+                if callable(image):
+                    image = image()
+                future = self._executor.submit(detect, self.spec, image, self.path(key))
+                self._pending[key] = future
+                future.add_done_callback(
+                    lambda future, key=key: self._finished(key, future)
+                )
+
+    def _finished(self, key, future):
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            # Broken image or detector, do not try again in this session
+            self.failed.add(key)
+            return
+        self.done.put(key)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            self._pending = {}
@@ -0,0 +1,160 @@
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import os
+import time
+import uuid
+
+from PIL import Image as PIL_Image
+
+from easybox.config import cfg
+from easybox.parallel import chunked, imap_bounded
+from easybox.scanner import FolderScanner
+
+# Folder of the proxies, next to the `easybox` annotation folder
+PROXY_FOLDER = "easybox_proxies"
+
+
+def proxy_folder(img_folder):
+    return os.path.join(img_folder, PROXY_FOLDER)
+
+
+def build_proxy(img_path, proxy_path, max_size, quality):
+    """Write a copy of the image whose sides are at most `max_size`."""
+    img = PIL_Image.open(img_path)
+    img.draft("RGB", (max_size, max_size))
+    img = img.convert("RGB")
+    img.thumbnail((max_size, max_size), PIL_Image.LANCZOS)
+    os.makedirs(os.path.dirname(proxy_path), exist_ok=True)
+    tmp_path = "{}.{}.tmp".format(proxy_path, uuid.uuid4().hex)
+    img.save(tmp_path, "JPEG", quality=quality)
+    os.replace(tmp_path, proxy_path)
+
+
+def build_chunk(max_size, quality, chunk):
+    """Build the proxies of (img_path, proxy_path) pairs in `chunk`, returns
+    the number built and the errors."""
+    built = 0
+    errors = []
+    for img_path, proxy_path in chunk:
+        try:
+            build_proxy(img_path, proxy_path, max_size, quality)
+            built += 1
+        # Pillow raises various errors on broken or too large images
+        except Exception as e:
+            errors.append((img_path, str(e)))
+    return built, errors
+
+
+class ProxyCache:
+    """Reduced copies of the images of a folder, decoded instead of the
+    originals when they exist.
+
+    A proxy is named after the path, modification time and size of the
+    original and the proxy size, so that it is not used anymore once the
+    original changes. Box coordinates still use the size of the original."""
+
+    def __init__(self, folder, max_size=2048, quality=90):
+        self.folder = folder
+        self.max_size = max_size
+        self.quality = quality
+
+    def path(self, img_path):
+        stat = os.stat(img_path)
+        digest = hashlib.sha1(
+            "{}|{}|{}|{}".format(
+                os.path.abspath(img_path), stat.st_mtime_ns, stat.st_size, self.max_size
+            ).encode("utf-8")
+        ).hexdigest()
+        return os.path.join(self.folder, digest[:2], digest + ".jpg")
+
+    def lookup(self, img_path):
+        """Path of the up to date proxy of `img_path`, None if there is no
+        such proxy."""
+        try:
+            proxy_path = self.path(img_path)
+        except OSError:
+            return None
+        return proxy_path if os.path.exists(proxy_path) else None
+
+    def build(self, img_paths, jobs=None, chunk_size=64, mp_context=None, prune=False):
+        """Build the missing proxies of `img_paths` on all cores. Returns a
+        dict of statistics.
+
+        Proxies are named by a hash, outdated ones can only be told apart
+        from those of other images of the folder: with `prune`, all proxies
+        that are not of `img_paths` are removed, which must then be all the
+        images of the folder.
+
+        `mp_context` is the multiprocessing context of the worker processes,
+        "spawn" must be used from a process with threads such as the
+        window."""
+        start = time.time()
+        wanted = set()
+        missing = []
+        for img_path in img_paths:
+            proxy_path = self.path(img_path)
+            wanted.add(proxy_path)
+            if not os.path.exists(proxy_path):
+                missing.append((img_path, proxy_path))
+
+        built = 0
+        errors = []
+        if missing:
+            jobs = jobs or os.cpu_count() or 1
+            with ProcessPoolExecutor(jobs, mp_context) as executor:
+                for chunk_built, chunk_errors in imap_bounded(
+                    executor,
+                    build_chunk,
+                    chunked(missing, chunk_size),
+                    jobs * 4,
+                    self.max_size,
+                    self.quality,
+                ):
+                    built += chunk_built
+                    errors += chunk_errors
+
+        removed = 0
+        if prune and os.path.isdir(self.folder):
+            for root, dirs, files in os.walk(self.folder):
+                for name in files:
+                    path = os.path.join(root, name)
+                    # Temporary files may be written by another build
+                    if name.endswith(".jpg") and path not in wanted:
+                        os.remove(path)
+                        removed += 1
+
+        return {
+            "images": len(img_paths),
+            "built": built,
+            "up_to_date": len(img_paths) - len(missing),
+            "removed": removed,
+            "errors": errors,
+            "seconds": time.time() - start,
+        }
+
+
+def build_proxies(
+    img_folder,
+    max_size=2048,
+    quality=90,
+    jobs=None,
+    recursive=False,
+    exts=None,
+    prune=False,
+):
+    """Build the proxies of all the images of `img_folder`, and remove the
+    other proxies if `prune`."""
+    if exts is None:
+        exts = cfg.supported_img_exts
+    scanner = FolderScanner(
+        img_folder,
+        exts,
+        recursive=recursive,
+        index_path=os.path.join(img_folder, "easybox", "index.json"),
+    )
+    img_paths = []
+    for kind, paths in scanner.scan():
+        if kind == "done":
+            img_paths = paths
+    proxies = ProxyCache(proxy_folder(img_folder), max_size, quality)
+    return proxies.build(img_paths, jobs, prune=prune)
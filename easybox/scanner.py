@@ -0,0 +1,147 @@
+import json
+import os
+import uuid
+
+INDEX_VERSION = 1
+
+
+def is_image(name, exts):
+    return os.path.splitext(name)[1][1:].lower() in exts
+
+
+class FolderScanner:
+    """Find the images in a folder with one `os.scandir` pass per directory.
+
+    The result is stored in an index file, so that the next scan of the same
+    folder only lists again the directories whose mtime changed.
+
+    `scan` yields ("add", paths) messages while images are found, and
+    finally a ("done", paths) message with the sorted list of all images."""
+
+    def __init__(
+        self, img_folder, exts, recursive=False, index_path=None, batch_size=1000
+    ):
+        self.img_folder = img_folder
+        self.exts = set(ext.lower() for ext in exts)
+        self.recursive = recursive
+        self.index_path = index_path
+        self.batch_size = batch_size
+        self.stopped = False
+        # Folders of annotations, proxies and video frames, never look
+        # into them
+        self.skip_dirs = {"easybox", "easybox_proxies", "easybox_frames"}
+
+    def stop(self):
+        self.stopped = True
+
+    def load_index(self):
+        if self.index_path is None or not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, "r") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if (
+            index.get("version") != INDEX_VERSION
+            or index.get("recursive") != self.recursive
+            or set(index.get("exts", [])) != self.exts
+        ):
+            return {}
+        return index["dirs"]
+
+    def save_index(self, dirs):
+        if self.index_path is None:
+            return
+        index = {
+            "version": INDEX_VERSION,
+            "recursive": self.recursive,
+            "exts": sorted(self.exts),
+            "dirs": dirs,
+        }
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        # Unique, other sessions may save the same index at the same time
+        tmp_path = "{}.{}.tmp".format(self.index_path, uuid.uuid4().hex)
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def iter_dir(self, path, files, subdirs):
+        """Yield the image names in `path` as they are found, and collect
+        them in `files` and the sub-directories to scan in `subdirs`."""
+        with os.scandir(path) as it:
+            for entry in it:
+                if self.stopped:
+                    break
+                if is_image(entry.name, self.exts):
+                    if entry.is_file():
+                        files.append(entry.name)
+                        yield entry.name
+                elif (
+                    self.recursive
+                    and entry.name not in self.skip_dirs
+                    and entry.is_dir(follow_symlinks=False)
+                ):
+                    subdirs.append(entry.name)
+
+    def scan(self):
+        cached_dirs = self.load_index()
+        # Images are removed from a directory by changing its mtime, only
+        # the images of unchanged directories are shown before the scan
+        mtimes = {}
+        known = set()
+        for rel_dir, entry in cached_dirs.items():
+            try:
+                mtime = os.stat(os.path.join(self.img_folder, rel_dir)).st_mtime_ns
+            except OSError:
+                continue
+            mtimes[rel_dir] = mtime
+            if mtime != entry["mtime"]:
+                continue
+            for name in entry["files"]:
+                known.add(
+                    os.path.normpath(os.path.join(self.img_folder, rel_dir, name))
+                )
+        if known:
+            yield "add", sorted(known)
+
+        dirs = {}
+        found = []
+        batch = []
+        stack = ["."]
+        while stack and not self.stopped:
+            rel_dir = stack.pop()
+            path = os.path.join(self.img_folder, rel_dir)
+            try:
+                mtime = mtimes.pop(rel_dir, None)
+                if mtime is None:
+                    mtime = os.stat(path).st_mtime_ns
+                entry = cached_dirs.get(rel_dir)
+                if entry is not None and entry["mtime"] == mtime:
+                    names = entry["files"]
+                else:
+                    entry = {"mtime": mtime, "files": [], "subdirs": []}
+                    names = self.iter_dir(path, entry["files"], entry["subdirs"])
+
+                for name in names:
+                    img_path = os.path.normpath(os.path.join(path, name))
+                    found.append(img_path)
+                    if img_path not in known:
+                        batch.append(img_path)
+                        # Show the very first image as soon as possible
+                        if len(batch) >= self.batch_size or len(found) == 1:
+                            yield "add", batch
+                            batch = []
+            except OSError:
+                continue
+            dirs[rel_dir] = entry
+            stack.extend(
+                os.path.normpath(os.path.join(rel_dir, d)) for d in entry["subdirs"]
+            )
+        if self.stopped:
+            return
+        if batch:
+            yield "add", batch
+
+        self.save_index(dirs)
+        yield "done", sorted(found)
@@ -0,0 +1,243 @@
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import uuid
+
+from easybox.boxes import BoxArray
+
+# Extensions of the videos that can be opened as a sequence of frames
+VIDEO_EXTS = [".mp4", ".avi", ".mov", ".mkv", ".webm"]
+
+# Folder of the frames of the videos, next to the videos
+FRAMES_FOLDER = "easybox_frames"
+
+
+def is_video(path):
+    return os.path.splitext(path)[1].lower() in VIDEO_EXTS
+
+
+def frames_folder(video_path):
+    return os.path.join(
+        os.path.dirname(os.path.abspath(video_path)),
+        FRAMES_FOLDER,
+        os.path.basename(video_path),
+    )
+
+
+def video_signature(video_path):
+    """Size and mtime of a video, the frames of a replaced video are
+    decoded again."""
+    stat = os.stat(video_path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def iter_jpegs(stream, chunk_size=1 << 16):
+    """Split a stream of concatenated JPEG images, as written by the
+    image2pipe muxer of ffmpeg, into the bytes of each image. Only the
+    current image is kept in memory."""
+    buf = bytearray()
+    # Position from which to look for the end of the current image
+    pos = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        buf += chunk
+        while True:
+            # ffmpeg writes no embedded thumbnails, the first end of image
+            # marker ends the image
+            end = buf.find(b"\xff\xd9", max(pos - 1, 2))
+            if end < 0:
+                pos = len(buf)
+                break
+            yield bytes(buf[: end + 2])
+            del buf[: end + 2]
+            pos = 0
+    if buf.strip():
+        raise ValueError("Truncated frame at the end of the video")
+
+
+class VideoSource:
+    """Frames of a video, decoded in order by ffmpeg into JPEG images
+    numbered from 000001.jpg in `frames_folder(video_path)`.
+
+    Used like FolderScanner: `scan` yields ("add", paths) messages as soon
+    as frames are written, so that the first frame is shown while the rest
+    of the video is decoded, and a final ("done", paths) message. ffmpeg
+    streams the frames through a pipe, so it never runs ahead of the
+    writing of the frames.
+
+    The frames are kept on disk, they are the images that annotations,
+    exports and the other tools refer to. They are decoded again when the
+    video is replaced, see `video_signature`."""
+
+    def __init__(self, video_path, ffmpeg="ffmpeg", quality=2, batch_size=1000):
+        self.video_path = video_path
+        self.ffmpeg = ffmpeg
+        self.quality = quality
+        self.batch_size = batch_size
+        self.folder = frames_folder(video_path)
+        # Signature of the video whose frames are all in the folder
+        self.done_path = os.path.join(self.folder, "frames.json")
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+    def frame_paths(self):
+        return sorted(
+            os.path.join(self.folder, name)
+            for name in os.listdir(self.folder)
+            if name.endswith(".jpg")
+        )
+
+    def is_complete(self, signature):
+        try:
+            with open(self.done_path, "r") as f:
+                return json.load(f) == signature
+        except (OSError, ValueError):
+            return False
+
+    def scan(self):
+        signature = video_signature(self.video_path)
+        os.makedirs(self.folder, exist_ok=True)
+        if self.is_complete(signature):
+            yield "done", self.frame_paths()
+            return
+
+        # Frames of an interrupted decoding or of a replaced video
+        if os.path.exists(self.done_path):
+            os.remove(self.done_path)
+        for path in self.frame_paths():
+            os.remove(path)
+        ffmpeg_path = shutil.which(self.ffmpeg)
+        if ffmpeg_path is None:
+            raise OSError(
+                "{} was not found, it is needed to read videos".format(self.ffmpeg)
+            )
+        with tempfile.TemporaryFile() as stderr:
+            process = subprocess.Popen(
+                [
+                    ffmpeg_path,
+                    "-v",
+                    "error",
+                    "-i",
+                    self.video_path,
+                    "-q:v",
+                    str(self.quality),
+                    "-c:v",
+                    "mjpeg",
+                    "-f",
+                    "image2pipe",
+                    "-",
+                ],
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+            )
+            paths = []
+            batch = []
+            try:
+                for data in iter_jpegs(process.stdout):
+                    if self.stopped:
+                        return
+                    path = os.path.join(
+                        self.folder, "{:06d}.jpg".format(len(paths) + 1)
+                    )
+                    with open(path, "wb") as f:
+                        f.write(data)
+                    paths.append(path)
+                    batch.append(path)
+                    # Show the very first frame as soon as possible
+                    if len(batch) >= self.batch_size or len(paths) == 1:
+                        yield "add", batch
+                        batch = []
+            finally:
+                process.stdout.close()
+                if self.stopped:
+                    process.kill()
+                returncode = process.wait()
+            if returncode != 0:
+                stderr.seek(0)
+                raise OSError(
+                    "Failed to decode {}: {}".format(
+                        self.video_path, stderr.read().decode(errors="replace").strip()
+                    )
+                )
+        if batch:
+            yield "add", batch
+        with open(self.done_path, "w") as f:
+            json.dump(signature, f)
+        yield "done", paths
+
+
+def interpolate_boxes(start, end, t):
+    """Boxes at fraction `t` of the way from keyframe boxes `start` to
+    `end`, paired by position. Colors are the ones of `start`."""
+    boxes = BoxArray()
+    for box0, box1 in zip(start, end):
+        boxes.append(
+            [v0 + (v1 - v0) * t for v0, v1 in zip(box0[:4], box1[:4])] + [box0[4]]
+        )
+    return boxes
+
+
+def interpolate(keyframes):
+    """Boxes of the frames between consecutive keyframes, given as sorted
+    (frame position, boxes) pairs, by linear interpolation.
+
+    Returns the (frame position, boxes) pairs of the frames in between, and
+    the pairs of keyframe positions that were skipped because they do not
+    have the same number of boxes."""
+    frames = []
+    skipped = []
+    for (idx0, boxes0), (idx1, boxes1) in zip(keyframes, keyframes[1:]):
+        if len(boxes0) != len(boxes1):
+            skipped.append((idx0, idx1))
+            continue
+        for idx in range(idx0 + 1, idx1):
+            frames.append(
+                (idx, interpolate_boxes(boxes0, boxes1, (idx - idx0) / (idx1 - idx0)))
+            )
+    return frames, skipped
+
+
+class Keyframes:
+    """Frames whose boxes were set by the annotator, stored by key in a
+    JSON file.
+
+    Other sessions may change the file of a shared folder, so it is read
+    again before each change, and only this change is applied to it."""
+
+    def __init__(self, path):
+        self.path = path
+        self.keys = set()
+        self.load()
+
+    def load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r") as f:
+                    self.keys = set(json.load(f))
+            except (OSError, ValueError):
+                pass
+
+    def __contains__(self, key):
+        return key in self.keys
+
+    def toggle(self, key):
+        remove = key in self.keys
+        self.load()
+        if remove:
+            self.keys.discard(key)
+        else:
+            self.keys.add(key)
+        self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = "{}.{}.tmp".format(self.path, uuid.uuid4().hex)
+        with open(tmp_path, "w") as f:
+            json.dump(sorted(self.keys), f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,87 @@
+from collections import defaultdict
+
+
+class GridIndex:
+    """Uniform grid over box coordinates, to find the boxes near a point
+    without looking at every box.
+
+    Each cell of `cell_size` image pixels holds the indices of the boxes
+    overlapping it. Indices are the positions of the boxes in the box
+    list, so the index must be rebuilt when a box before others is
+    removed."""
+
+    def __init__(self, cell_size=64):
+        self.cell_size = max(1, cell_size)
+        self._cells = defaultdict(set)
+
+    def _cells_of(self, x0, y0, x1, y1):
+        size = self.cell_size
+        for cy in range(int(y0 // size), int(y1 // size) + 1):
+            for cx in range(int(x0 // size), int(x1 // size) + 1):
+                yield cx, cy
+
+    def insert(self, idx, bbox):
+        top, left, bottom, right = bbox[:4]
+        for cell in self._cells_of(left, top, right, bottom):
+            self._cells[cell].add(idx)
+
+    def remove(self, idx, bbox):
+        top, left, bottom, right = bbox[:4]
+        for cell in self._cells_of(left, top, right, bottom):
+            indices = self._cells.get(cell)
+            if indices is not None:
+                indices.discard(idx)
+                if not indices:
+                    del self._cells[cell]
+
+    def rebuild(self, bboxes, cell_size=None):
+        if cell_size is not None:
+            self.cell_size = max(1, cell_size)
+        self._cells.clear()
+        for idx, bbox in enumerate(bboxes):
+            self.insert(idx, bbox)
+
+    def query(self, x0, y0, x1, y1):
+        """Indices of the boxes that may overlap the given rectangle."""
+        found = set()
+        for cell in self._cells_of(x0, y0, x1, y1):
+            indices = self._cells.get(cell)
+            if indices:
+                found |= indices
+        return found
+
+    def hit_test(self, bboxes, x, y, tolerance):
+        """Find the box under image point (x, y).
+
+        Returns (idx, edges), where edges lists the box edges ("top", "left",
+        "bottom", "right") within `tolerance` of the point, and is empty when
+        the point is inside the box away from its edges. Boxes whose edges
+        are hit are preferred, then the smallest box. Returns (None, ()) if
+        there is no box under the point."""
+        best = None
+        for idx in self.query(
+            x - tolerance, y - tolerance, x + tolerance, y + tolerance
+        ):
+            top, left, bottom, right = bboxes[idx][:4]
+            if not (
+                left - tolerance <= x <= right + tolerance
+                and top - tolerance <= y <= bottom + tolerance
+            ):
+                continue
+            edges = []
+            if abs(y - top) <= tolerance:
+                edges.append("top")
+            elif abs(y - bottom) <= tolerance:
+                edges.append("bottom")
+            if abs(x - left) <= tolerance:
+                edges.append("left")
+            elif abs(x - right) <= tolerance:
+                edges.append("right")
+            if not edges and not (left <= x <= right and top <= y <= bottom):
+                continue
+            rank = (0 if edges else 1, (bottom - top) * (right - left), idx)
+            if best is None or rank < best[0]:
+                best = (rank, idx, tuple(edges))
+        if best is None:
+            return None, ()
+        return best[1], best[2]
@@ -0,0 +1,136 @@
+from array import array
+import bisect
+import json
+import os
+import threading
+import uuid
+
+# Box count of an image without annotation file
+NOT_ANNOTATED = -1
+
+# Navigation filters, see StatusIndex.matches
+FILTERS = ["all", "unannotated", "empty", "min_boxes", "changed_since"]
+
+
+class StatusIndex:
+    """Annotation state of every image: number of boxes, or NOT_ANNOTATED,
+    and modification time of the annotation.
+
+    The state is read from the store once in background with `refresh`,
+    which only reads again the annotation files changed since the last
+    refresh thanks to a cache file, and is updated by `set` on every save.
+
+    `bind` aligns the state with the image list, so that the next image
+    without annotation is found by bisection and filters only scan arrays."""
+
+    def __init__(self, store, cache_path=None):
+        self.store = store
+        self.cache_path = cache_path
+        self.ready = False
+        self._stats = {}
+        self._lock = threading.Lock()
+        self.keys = []
+        self._positions = {}
+        self.counts = array("i")
+        self.mtimes = array("d")
+        # Sorted positions of the images without annotation
+        self._unannotated = []
+
+    def load_cache(self):
+        if self.cache_path is None or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, "r") as f:
+                return {key: tuple(value) for key, value in json.load(f).items()}
+        except (OSError, ValueError):
+            return {}
+
+    def save_cache(self):
+        if self.cache_path is None:
+            return
+        with self._lock:
+            stats = dict(self._stats)
+        tmp_path = "{}.{}.tmp".format(self.cache_path, uuid.uuid4().hex)
+        with open(tmp_path, "w") as f:
+            json.dump(stats, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def refresh(self):
+        """Read the state of all annotations, can run on any thread."""
+        stats = self.store.stats(self.load_cache())
+        with self._lock:
+            # Saves done meanwhile are newer
+            stats.update(self._stats)
+            self._stats = stats
+        self.save_cache()
+        self.ready = True
+
+    def bind(self, keys):
+        """Align the state with the images `keys`, in navigation order."""
+        with self._lock:
+            stats = self._stats
+            self.keys = keys
+            self._positions = {key: idx for idx, key in enumerate(keys)}
+            self.counts = array(
+                "i", (stats.get(key, (0, NOT_ANNOTATED))[1] for key in keys)
+            )
+            self.mtimes = array("d", (stats.get(key, (0, 0))[0] for key in keys))
+        self._unannotated = [
+            idx for idx, count in enumerate(self.counts) if count == NOT_ANNOTATED
+        ]
+
+    def set(self, key, count, mtime):
+        with self._lock:
+            self._stats[key] = (mtime, count)
+        idx = self._positions.get(key)
+        if idx is None:
+            return
+        if self.counts[idx] == NOT_ANNOTATED and count != NOT_ANNOTATED:
+            pos = bisect.bisect_left(self._unannotated, idx)
+            if pos < len(self._unannotated) and self._unannotated[pos] == idx:
+                del self._unannotated[pos]
+        self.counts[idx] = count
+        self.mtimes[idx] = mtime
+
+    def num_annotated(self):
+        return len(self.keys) - len(self._unannotated)
+
+    def next_unannotated(self, idx, step=1):
+        """Position of the next image without annotation after `idx`, before
+        it if `step` is -1, None if there is none."""
+        if step > 0:
+            pos = bisect.bisect_right(self._unannotated, idx)
+            return self._unannotated[pos] if pos < len(self._unannotated) else None
+        pos = bisect.bisect_left(self._unannotated, idx)
+        return self._unannotated[pos - 1] if pos > 0 else None
+
+    def matches(self, idx, kind, value=None):
+        """Whether image `idx` passes the navigation filter `kind`:
+        "all", "unannotated", "empty" (annotated without box),
+        "min_boxes" (more than `value` boxes) or "changed_since"
+        (annotation modified after timestamp `value`)."""
+        count = self.counts[idx]
+        if kind == "unannotated":
+            return count == NOT_ANNOTATED
+        if kind == "empty":
+            return count == 0
+        if kind == "min_boxes":
+            return count > value
+        if kind == "changed_since":
+            return count != NOT_ANNOTATED and self.mtimes[idx] >= value
+        return True
+
+    def next_match(self, idx, kind, value=None, step=1):
+        """Position of the next image after `idx` (before it if `step` is
+        -1) passing the filter, None if there is none."""
+        if kind == "all":
+            idx += step
+            return idx if 0 <= idx < len(self.keys) else None
+        if kind == "unannotated":
+            return self.next_unannotated(idx, step)
+        idx += step
+        while 0 <= idx < len(self.keys):
+            if self.matches(idx, kind, value):
+                return idx
+            idx += step
+        return None
@@ -0,0 +1,220 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import math
+import os
+import threading
+
+from PIL import Image as PIL_Image
+
+from easybox.loader import open_large_image
+
+
+class TilePyramid:
+    """Multi-resolution tiles of a large image, cached on disk.
+
+    Level 0 is the original resolution and each level halves the previous
+    one, up to a level that fits in a single tile. Levels are built on a
+    background thread the first time they are requested; JPEG levels are
+    decoded directly at reduced scale when possible. Tiles are then read
+    back from disk on demand and kept in a small in-memory LRU cache.
+
+    Images of archives are read from `source`, an ArchiveSource. Images of
+    up to `max_pixels` pixels can be opened, see open_large_image. When a
+    level fails to build, `error` is set and no level is built anymore."""
+
+    def __init__(
+        self,
+        path,
+        cache_folder,
+        tile_size=256,
+        max_tiles=512,
+        source=None,
+        max_pixels=None,
+    ):
+        self.path = path
+        self.source = source
+        self.tile_size = tile_size
+        self.max_tiles = max_tiles
+        self.max_pixels = max_pixels
+        self.error = None
+        with open_large_image(path, source, max_pixels) as img:
+            self.size = img.size
+            self.format = img.format
+        self.num_levels = 1
+        while max(self.level_size(self.num_levels - 1)) > tile_size:
+            self.num_levels += 1
+
+        # Tiles of archive members are outdated when the archive changes
+        stat = os.stat(path if source is None else source.path)
+        digest = hashlib.sha1(
+            "{}|{}|{}|{}".format(
+                os.path.abspath(path), stat.st_mtime_ns, stat.st_size, tile_size
+            ).encode("utf-8")
+        ).hexdigest()
+        self.cache_folder = os.path.join(cache_folder, digest)
+
+        self._tiles = OrderedDict()
+        self._lock = threading.Lock()
+        self._building = set()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="easybox-tiles"
+        )
+
+    def level_size(self, level):
+        factor = 2**level
+        return (
+            max(1, math.ceil(self.size[0] / factor)),
+            max(1, math.ceil(self.size[1] / factor)),
+        )
+
+    def level_for_scale(self, scale):
+        """Coarsest level that still has at least one pixel per canvas
+        pixel, when one canvas pixel shows `scale` image pixels."""
+        if scale <= 1:
+            return 0
+        return min(int(math.log2(scale)), self.num_levels - 1)
+
+    def level_folder(self, level):
+        return os.path.join(self.cache_folder, str(level))
+
+    def tile_path(self, level, tx, ty):
+        return os.path.join(self.level_folder(level), "{}_{}.png".format(ty, tx))
+
+    def is_built(self, level):
+        return os.path.exists(os.path.join(self.level_folder(level), "done"))
+
+    def built_level(self, level):
+        """The finest built level that is not finer than `level`, None if no
+        level is built yet."""
+        for cur_level in range(level, self.num_levels):
+            if self.is_built(cur_level):
+                return cur_level
+        return None
+
+    def request(self, level):
+        """Build `level` in background if needed. Returns whether it is
+        already available."""
+        if self.is_built(level):
+            return True
+        with self._lock:
+            if self.error is None and level not in self._building:
+                self._building.add(level)
+                self._executor.submit(self._build, level)
+        return False
+
+    def get_tile(self, level, tx, ty):
+        key = (level, tx, ty)
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+                return tile
+        tile = PIL_Image.open(self.tile_path(level, tx, ty))
+        tile.load()
+        with self._lock:
+            self._tiles[key] = tile
+            while len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+        return tile
+
+    def num_tiles(self, level):
+        width, height = self.level_size(level)
+        return math.ceil(width / self.tile_size), math.ceil(height / self.tile_size)
+
+    def _build(self, level):
+        try:
+            level_size = self.level_size(level)
+            img = open_large_image(self.path, self.source, self.max_pixels)
+            # Only decode the pixels needed for this level
+            img.draft("RGB", level_size)
+            img = img.convert("RGB")
+            if img.size != level_size:
+                img = img.resize(level_size, PIL_Image.LANCZOS, reducing_gap=3.0)
+
+            os.makedirs(self.level_folder(level), exist_ok=True)
+            num_x, num_y = self.num_tiles(level)
+            for ty in range(num_y):
+                for tx in range(num_x):
+                    left, top = tx * self.tile_size, ty * self.tile_size
+                    tile = img.crop(
+                        (
+                            left,
+                            top,
+                            min(left + self.tile_size, level_size[0]),
+                            min(top + self.tile_size, level_size[1]),
+                        )
+                    )
+                    tile.save(self.tile_path(level, tx, ty), compress_level=1)
+            del img
+            open(os.path.join(self.level_folder(level), "done"), "w").close()
+        except Exception as e:
+            # Reported by the window, building again would fail the same way
+            self.error = e
+        finally:
+            with self._lock:
+                self._building.discard(level)
+
+    def render(self, view_x, view_y, scale, canvas_size, resample):
+        """Compose the tiles visible on a canvas of `canvas_size`, whose top
+        left corner shows the image pixel (view_x, view_y) and where each
+        canvas pixel covers `scale` image pixels.
+
+        Returns the composed image and whether the wanted level was used,
+        otherwise a coarser one is shown while the wanted one is built."""
+        canvas_w, canvas_h = canvas_size
+        view = PIL_Image.new("RGB", canvas_size, "gray")
+        wanted_level = self.level_for_scale(scale)
+        exact = self.request(wanted_level)
+        level = self.built_level(wanted_level)
+        if level is None:
+            self.request(self.num_levels - 1)
+            return view, False
+
+        # Size of a tile and of the visible area in original image pixels
+        factor = 2**level
+        tile_span = self.tile_size * factor
+        right = min(view_x + canvas_w * scale, self.size[0])
+        bottom = min(view_y + canvas_h * scale, self.size[1])
+        num_x, num_y = self.num_tiles(level)
+        for ty in range(max(0, int(view_y // tile_span)), num_y):
+            if ty * tile_span >= bottom:
+                break
+            for tx in range(max(0, int(view_x // tile_span)), num_x):
+                if tx * tile_span >= right:
+                    break
+                tile = self.get_tile(level, tx, ty)
+                x0 = (tx * tile_span - view_x) / scale
+                y0 = (ty * tile_span - view_y) / scale
+                x1 = (tx * tile_span + tile.width * factor - view_x) / scale
+                y1 = (ty * tile_span + tile.height * factor - view_y) / scale
+                # Only resize the part of the tile that is on the canvas
+                crop_x0, crop_y0 = max(0, x0), max(0, y0)
+                crop_x1, crop_y1 = min(canvas_w, x1), min(canvas_h, y1)
+                if crop_x1 - crop_x0 < 1 or crop_y1 - crop_y0 < 1:
+                    continue
+                tile_scale = tile.width / (x1 - x0)
+                box = (
+                    (crop_x0 - x0) * tile_scale,
+                    (crop_y0 - y0) * tile_scale,
+                    (crop_x1 - x0) * tile_scale,
+                    (crop_y1 - y0) * tile_scale,
+                )
+                dst_size = (
+                    round(crop_x1) - round(crop_x0),
+                    round(crop_y1) - round(crop_y0),
+                )
+                if dst_size[0] < 1 or dst_size[1] < 1:
+                    continue
+                view.paste(
+                    tile.resize(dst_size, resample, box=box),
+                    (round(crop_x0), round(crop_y0)),
+                )
+        return view, exact and level == wanted_level
+
+    def building(self):
+        with self._lock:
+            return bool(self._building)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,83 @@
+from collections import deque
+from contextlib import contextmanager, nullcontext
+import json
+import os
+import threading
+import time
+
+
+class Tracer:
+    """Durations of named stages, such as decoding or drawing an image.
+
+    The last `window` durations of each stage are kept to compute rolling
+    percentiles, and the last `max_events` spans of all stages are kept to
+    be exported in the Chrome trace format (chrome://tracing, Perfetto).
+    Spans can be recorded from any thread."""
+
+    def __init__(self, window=200, max_events=100000):
+        self.window = window
+        self._durations = {}
+        self._events = deque(maxlen=max_events)
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter() - start)
+
+    def add(self, name, start, duration):
+        """Record a span of `duration` seconds, started at `start` as given
+        by time.perf_counter()."""
+        with self._lock:
+            durations = self._durations.get(name)
+            if durations is None:
+                durations = self._durations[name] = deque(maxlen=self.window)
+            durations.append(duration)
+            self._events.append(
+                (name, start - self._origin, duration, threading.get_ident())
+            )
+
+    def percentiles(self, name, qs=(0.5, 0.95)):
+        """Percentiles of the recent durations of `name` in seconds, None if
+        it was never recorded."""
+        with self._lock:
+            durations = sorted(self._durations.get(name, ()))
+        if not durations:
+            return None
+        return tuple(
+            durations[min(len(durations) - 1, int(q * len(durations)))] for q in qs
+        )
+
+    def stages(self):
+        with self._lock:
+            return sorted(self._durations)
+
+    def export_chrome(self, path):
+        """Write the recorded spans as a Chrome trace JSON file."""
+        with self._lock:
+            events = list(self._events)
+        pid = os.getpid()
+        trace_events = [
+            {
+                "name": name,
+                "ph": "X",
+                "ts": start * 1e6,
+                "dur": duration * 1e6,
+                "pid": pid,
+                "tid": tid,
+            }
+            for name, start, duration, tid in events
+        ]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f)
+
+
+def span(tracer, name):
+    """`tracer.span(name)`, or nothing when `tracer` is None."""
+    if tracer is None:
+        return nullcontext()
+    return tracer.span(name)
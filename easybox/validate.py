@@ -0,0 +1,157 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import math
+import os
+import time
+
+from PIL import Image as PIL_Image
+
+from easybox.annotations import open_store
+from easybox.config import cfg
+from easybox.export import read_image_info
+from easybox.parallel import chunked, imap_bounded
+from easybox.scanner import FolderScanner
+
+_stores = {}
+
+
+def check_boxes(bboxes, width, height, num_colors):
+    """Problems of the boxes of an image of `width` x `height`, as a list
+    of (box index, message)."""
+    problems = []
+    seen = {}
+    for idx, (top, left, bottom, right, color_id) in enumerate(bboxes):
+        if top < 0 or left < 0 or bottom > height or right > width:
+            problems.append((idx, "outside of the {}x{} image".format(width, height)))
+        if bottom <= top or right <= left:
+            problems.append((idx, "zero area"))
+        if not 0 <= color_id < num_colors:
+            problems.append((idx, "color_id {} has no color".format(color_id)))
+        coords = (top, left, bottom, right)
+        if coords in seen:
+            problems.append((idx, "duplicate of box {}".format(seen[coords])))
+        else:
+            seen[coords] = idx
+    return problems
+
+
+def size_bucket(top, left, bottom, right):
+    """Power of two bucket of the side of the square of the same area."""
+    side = math.sqrt(max(0, bottom - top) * max(0, right - left))
+    return int(math.log2(side)) if side >= 1 else -1
+
+
+def validate_chunk(job, chunk):
+    """Check the annotations of (img_path, key) pairs in `chunk` against
+    the image sizes read from the image headers.
+
+    Returns the problems as (key, message) pairs, and the statistics of
+    the chunk, aggregated here so that only counters go back to the
+    parent process."""
+    store_key = (job["boxes_folder"], job["store"])
+    if store_key not in _stores:
+        _stores[store_key] = open_store(*store_key)
+    store = _stores[store_key]
+
+    problems = []
+    counts = Counter()
+    sizes = Counter()
+    for img_path, key in chunk:
+        try:
+            bboxes = store.load(key)
+        except ValueError as e:
+            problems.append((key, "unreadable annotation: {}".format(e)))
+            continue
+        if bboxes is None:
+            # Not annotated yet
+            continue
+        try:
+            width, height, _ = read_image_info(img_path)
+        except (OSError, PIL_Image.DecompressionBombError) as e:
+            problems.append((key, "unreadable image: {}".format(e)))
+            continue
+        counts[len(bboxes)] += 1
+        for bbox in bboxes:
+            sizes[size_bucket(*bbox[:4])] += 1
+        for idx, message in check_boxes(bboxes, width, height, job["num_colors"]):
+            problems.append((key, "box {}: {}".format(idx, message)))
+    return problems, counts, sizes
+
+
+def validate(
+    img_folder,
+    jobs=None,
+    recursive=False,
+    store="txt",
+    exts=None,
+    chunk_size=256,
+    report=None,
+):
+    """Check all the annotations of `img_folder` on all cores: boxes out of
+    the image, of zero area, with a color_id past the end of
+    `Config.box_colors` or duplicated, unreadable files, and annotations
+    without image.
+
+    `report(key, message)` is called for each problem as soon as it is
+    found. Returns a dict of statistics, with the number of images per box
+    count and the number of boxes per size bucket (see `size_bucket`)."""
+    if exts is None:
+        exts = cfg.supported_img_exts
+    start = time.time()
+    boxes_folder = os.path.join(img_folder, "easybox")
+    scanner = FolderScanner(
+        img_folder,
+        exts,
+        recursive=recursive,
+        index_path=os.path.join(boxes_folder, "index.json"),
+    )
+    img_paths = []
+    for kind, paths in scanner.scan():
+        if kind == "done":
+            img_paths = paths
+    keys = [os.path.relpath(p, img_folder) for p in img_paths]
+
+    num_problems = 0
+    counts = Counter()
+    sizes = Counter()
+
+    # Annotations left behind by renamed or removed images
+    annotation_store = open_store(boxes_folder, store)
+    orphans = set(annotation_store.keys()) - set(keys)
+    annotation_store.close()
+    for key in sorted(orphans):
+        num_problems += 1
+        if report is not None:
+            report(key, "annotation without image")
+
+    job = {
+        "boxes_folder": boxes_folder,
+        "store": store,
+        "num_colors": len(cfg.box_colors),
+    }
+    jobs = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(jobs) as executor:
+        for chunk_problems, chunk_counts, chunk_sizes in imap_bounded(
+            executor,
+            validate_chunk,
+            chunked(zip(img_paths, keys), chunk_size),
+            jobs * 4,
+            job,
+        ):
+            num_problems += len(chunk_problems)
+            if report is not None:
+                for key, message in chunk_problems:
+                    report(key, message)
+            counts.update(chunk_counts)
+            sizes.update(chunk_sizes)
+
+    return {
+        "images_scanned": len(img_paths),
+        "images": sum(counts.values()),
+        "boxes": sum(count * num for count, num in counts.items()),
+        "problems": num_problems,
+        "orphans": len(orphans),
+        "images_per_box_count": dict(counts),
+        "boxes_per_size": dict(sizes),
+        "seconds": time.time() - start,
+    }